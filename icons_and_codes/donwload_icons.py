@@ -1,5 +1,6 @@
 import os
 import requests
+from concurrent.futures import ThreadPoolExecutor
 
 # Weather condition codes from your list
 weather_codes = [
@@ -16,16 +17,28 @@ headers = {
     'Referer': 'https://www.weatherapi.com/'
 }
 
+# Number of icons downloaded at the same time
+MAX_WORKERS = 16
+
+# Reuse keep-alive connections to the CDN for every download, with enough
+# pooled connections for all the workers
+session = requests.Session()
+session.headers.update(headers)
+session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=MAX_WORKERS))
+
 # Create output directory
 os.makedirs("weather_icons", exist_ok=True)
 
-# Download with headers
-for code in weather_codes:
+def download_icon(code):
     url = f"https://cdn.weatherapi.com/weather/64x64/day/{code}.png"
-    response = requests.get(url, headers=headers)
+    response = session.get(url)
     if response.status_code == 200:
         with open(f"weather_icons/{code}.png", "wb") as f:
             f.write(response.content)
         print(f"Downloaded icon for code {code}")
     else:
         print(f"Failed to download icon for code {code}, status: {response.status_code}")
+
+# Download with headers, several icons at a time
+with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+    list(executor.map(download_icon, weather_codes))
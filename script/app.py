@@ -1,34 +1,331 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory
-from datetime import datetime
-import json
+from flask import Flask, render_template, request, jsonify
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.exceptions import HTTPException
+from datetime import datetime, date, timedelta
+from bisect import bisect_left
+import gzip
+import hashlib
+import mmap
 import os
+import sqlite3
 import sys
-from geopy.distance import geodesic
 from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut
+from geopy.adapters import RequestsAdapter
+from geopy.exc import GeocoderServiceError, GeocoderTimedOut
+from geopy.location import Location
 import numpy as np
+from scipy.spatial import cKDTree
 from functools import lru_cache
-from typing import Tuple, Dict, Any, List
+from itertools import islice
+from typing import Tuple, Dict, Any, List, Iterable, Iterator
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import orjson
+from flask_compress import Compress
+from whitenoise import WhiteNoise
 
 # Add the score_system directory to the path
 script_dir = os.path.dirname(os.path.abspath(__file__))
 score_system_dir = os.path.join(script_dir, 'score_system')
 sys.path.append(score_system_dir)
 
-from sunny_score import get_top_sunny_destinations, calculate_destination_sunny_score
-from comfort_index import get_top_comfortable_destinations, calculate_destination_comfort_score
+from sunny_score import get_top_sunny_destinations, calculate_sunny_scores, sunny_score_summary
+from comfort_index import get_top_comfortable_destinations, calculate_comfort_scores, comfort_score_summary
+from forecast_arrays import build_forecast_arrays, window_averages, window_hourly_data
+from forecast_index import build_date_index
+from geo_distance import EARTH_RADIUS_MILES, distance_miles_within, location_coordinates, unit_sphere_xyz, chord_length
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Route jsonify() and request.json through orjson, which is several times
+    faster than the stdlib encoder and serializes NumPy values directly.
+    Keys are kept in the order responses build them.
+    """
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.options).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self.options)
+        return self._app.response_class(body, mimetype=self.mimetype)
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+
+# Compress JSON responses (including the streamed projection) for clients that accept it.
+# The algorithms are listed explicitly since Flask-Compress releases differ in their
+# defaults (recent ones leave gzip out for streamed responses)
+app.config['COMPRESS_MIMETYPES'] = ['application/json']
+app.config['COMPRESS_LEVEL'] = 6
+app.config['COMPRESS_MIN_SIZE'] = 2048
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip', 'deflate']
+app.config['COMPRESS_ALGORITHM_STREAMING'] = ['br', 'gzip', 'deflate']
+app.config['COMPRESS_REGISTER'] = False
+compress = Compress(app)
+
+# Endpoints served by json_payload_response, which picks between its own pre-gzipped
+# and identity bodies (each with its own ETag) and must not be re-encoded
+PRECOMPRESSED_ENDPOINTS = {'get_weather_data', 'get_grid_boundaries'}
+
+@app.after_request
+def compress_response(response):
+    """Compress the response unless its endpoint serves precompressed payloads"""
+    if request.endpoint in PRECOMPRESSED_ENDPOINTS:
+        return response
+    return compress.after_request(response)
+
+# /search measures distances with the cheap-ruler approximation by default, which can
+# move a destination within ~0.1% of the distance limit to the other side of it, so one
+# right at the limit may be left out. Set APPROX_DISTANCE=0 in the environment for
+# exact geodesic distances
+app.config['APPROX_DISTANCE'] = os.environ.get('APPROX_DISTANCE', '1') != '0'
+
+# Weather icons live outside the Flask app folder; resolve the directory once
+WEATHER_ICONS_DIR = os.path.normpath(os.path.join(script_dir, '..', 'icons_and_codes', 'weather_icons'))
+
+# Icons never change for a given filename, so browsers may keep them for a year
+WEATHER_ICON_MAX_AGE = 365 * 24 * 60 * 60
+
+# Icons are served by WhiteNoise in front of Flask: files are indexed once at startup
+# and sent without routing or per-request stat calls, marked immutable. A reverse
+# proxy or CDN in front of the app can cache or serve /weather-icons/ directly
+app.wsgi_app = WhiteNoise(
+    app.wsgi_app,
+    root=WEATHER_ICONS_DIR,
+    prefix='weather-icons/',
+    max_age=WEATHER_ICON_MAX_AGE,
+    immutable_file_test=lambda path, url: True
+)
+
+# Seconds to wait for a Nominatim response before giving up (geopy's default is 1s)
+GEOCODER_TIMEOUT = 3
+
+# Initialize geocoder with a custom user agent. RequestsAdapter keeps one pooled
+# keep-alive session for the life of the process, sized for concurrent requests
+geolocator = Nominatim(
+    user_agent="travel_app",
+    timeout=GEOCODER_TIMEOUT,
+    adapter_factory=lambda proxies, ssl_context: RequestsAdapter(
+        proxies=proxies, ssl_context=ssl_context, pool_maxsize=16
+    )
+)
+
+# Geocoder results are reused for a day; Nominatim's usage policy asks clients to cache
+GEOCODE_CACHE_TTL = 24 * 60 * 60
+
+def _geocode_ttl_bucket() -> int:
+    """Current cache period - cached geocoder results expire when it rolls over"""
+    return int(time.time() // GEOCODE_CACHE_TTL)
+
+# Geocoder results are also stored on disk for GEOCODE_DB_TTL, so a restart or
+# another worker process doesn't ask Nominatim again for a query already answered.
+# Empty answers are only kept in memory, so a transient miss isn't stored for a month
+GEOCODE_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'geocode_cache.sqlite3')
+GEOCODE_DB_TTL = 30 * 24 * 60 * 60
+_geocode_db = None
+_geocode_db_pid = None
+_geocode_db_lock = threading.Lock()
+
+# Returned by _geocode_db_get when there is no usable stored result
+_NOT_STORED = object()
+
+def _geocode_db_connection() -> sqlite3.Connection:
+    """This process's connection to the geocode cache, opened on first use (so after any fork)"""
+    global _geocode_db, _geocode_db_pid
+    
+    if _geocode_db is None or _geocode_db_pid != os.getpid():
+        _geocode_db = sqlite3.connect(GEOCODE_DB_PATH, timeout=5, isolation_level=None, check_same_thread=False)
+        # WAL lets the worker processes read while one of them writes
+        _geocode_db.execute('PRAGMA journal_mode=WAL')
+        _geocode_db.execute(
+            'CREATE TABLE IF NOT EXISTS geocode_cache '
+            '(kind TEXT, query TEXT, result BLOB, ts INTEGER, PRIMARY KEY (kind, query))'
+        )
+        _geocode_db.execute(
+            'CREATE TABLE IF NOT EXISTS nominatim_rate (id INTEGER PRIMARY KEY, next_slot REAL)'
+        )
+        _geocode_db_pid = os.getpid()
+    
+    return _geocode_db
+
+def _geocode_db_get(kind: str, query: str) -> Any:
+    """The stored result for a query if younger than GEOCODE_DB_TTL, else _NOT_STORED"""
+    try:
+        with _geocode_db_lock:
+            row = _geocode_db_connection().execute(
+                'SELECT result FROM geocode_cache WHERE kind = ? AND query = ? AND ts > ?',
+                (kind, query, int(time.time()) - GEOCODE_DB_TTL)
+            ).fetchone()
+    except sqlite3.Error as e:
+        # The disk cache is only an optimization; fall back to Nominatim
+        print(f"Geocode cache read failed: {e}")
+        return _NOT_STORED
+    
+    return _NOT_STORED if row is None else orjson.loads(row[0])
+
+def _geocode_db_put(kind: str, query: str, result: Any):
+    """Store a JSON-serializable result for a query"""
+    try:
+        with _geocode_db_lock:
+            _geocode_db_connection().execute(
+                'INSERT OR REPLACE INTO geocode_cache VALUES (?, ?, ?, ?)',
+                (kind, query, orjson.dumps(result), int(time.time()))
+            )
+    except sqlite3.Error as e:
+        print(f"Geocode cache write failed: {e}")
+
+# Nominatim's usage policy allows at most one request per second from the whole
+# application, so every worker process claims its request slots through the
+# shared SQLite file (or, if that fails, spaces its own requests)
+NOMINATIM_MIN_INTERVAL = 1.0
+_nominatim_next_slot = 0.0
+
+def _claim_nominatim_slot() -> float:
+    """Reserve the next free Nominatim request slot across all processes and return its start time"""
+    global _nominatim_next_slot
+    
+    with _geocode_db_lock:
+        try:
+            db = _geocode_db_connection()
+            # IMMEDIATE takes the write lock up front, so no two processes claim the same slot
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                row = db.execute('SELECT next_slot FROM nominatim_rate WHERE id = 0').fetchone()
+                slot = max(time.time(), row[0] if row else 0.0)
+                db.execute('INSERT OR REPLACE INTO nominatim_rate VALUES (0, ?)', (slot + NOMINATIM_MIN_INTERVAL,))
+                db.execute('COMMIT')
+            except sqlite3.Error:
+                db.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            print(f"Shared Nominatim rate limit unavailable, limiting this process only: {e}")
+            slot = max(time.time(), _nominatim_next_slot)
+            _nominatim_next_slot = slot + NOMINATIM_MIN_INTERVAL
+    
+    return slot
+
+def nominatim_geocode(query: str, **kwargs):
+    """
+    geolocator.geocode, waiting for a free request slot first. Errors are passed
+    straight through so timeouts still surface as 503s and aren't cached.
+    """
+    time.sleep(max(0.0, _claim_nominatim_slot() - time.time()))
+    return geolocator.geocode(query, **kwargs)
+
+@lru_cache(maxsize=4096)
+def _geocode_cached(query: str, ttl_bucket: int):
+    stored = _geocode_db_get('geocode', query)
+    
+    # A stored None is an empty answer from before those stopped being persisted
+    if stored is _NOT_STORED or stored is None:
+        location = nominatim_geocode(query)
+        if not location:
+            return None
+        stored = {'address': location.address, 'lat': location.latitude, 'lon': location.longitude}
+        _geocode_db_put('geocode', query, stored)
+    
+    return Location(stored['address'], (stored['lat'], stored['lon']), {})
+
+@lru_cache(maxsize=4096)
+def _suggest_cached(query: str, ttl_bucket: int) -> Tuple[Dict[str, Any], ...]:
+    stored = _geocode_db_get('suggest', query)
+    if stored is not _NOT_STORED and stored:
+        return tuple(stored)
+    
+    locations = nominatim_geocode(
+        query,
+        exactly_one=False,
+        limit=5,
+        addressdetails=True,
+        country_codes=['gb']  # Limit to UK
+    )
+    
+    suggestions = tuple(
+        {'display_name': loc.address, 'lat': loc.latitude, 'lon': loc.longitude}
+        for loc in locations or () if loc.address
+    )
+    if suggestions:
+        _geocode_db_put('suggest', query, suggestions)
+    return suggestions
+
+# Nominatim lookups run on a shared pool sized to the adapter's connection pool.
+# Identical queries already in flight share one lookup, and a request gives up
+# waiting after GEOCODE_WAIT_TIMEOUT seconds instead of tying up its worker
+GEOCODE_WAIT_TIMEOUT = 10
+_geocode_executor = ThreadPoolExecutor(max_workers=16)
+_geocode_in_flight = {}
+_geocode_in_flight_lock = threading.Lock()
+
+def _geocode_in_background(lookup, query: str):
+    key = (lookup, query, _geocode_ttl_bucket())
+    
+    with _geocode_in_flight_lock:
+        future = _geocode_in_flight.get(key)
+        if future is None:
+            future = _geocode_executor.submit(lookup, query, key[2])
+            _geocode_in_flight[key] = future
+            future.add_done_callback(lambda _: _geocode_in_flight.pop(key, None))
+    
+    return future
+
+def _wait_for_geocode(future):
+    try:
+        return future.result(timeout=GEOCODE_WAIT_TIMEOUT)
+    except FutureTimeoutError:
+        raise GeocoderTimedOut("Geocoding service did not respond in time")
 
-# Initialize geocoder with a custom user agent
-geolocator = Nominatim(user_agent="travel_app")
+def geocode_location(query: str):
+    """Geocode a free-text location, reusing recent results for the same query"""
+    return _wait_for_geocode(_geocode_in_background(_geocode_cached, query.strip().lower()))
 
-# Global cache for performance optimization
-_distance_cache = {}
-_score_cache = {}
-_closest_location_cache = {}
+# Shorter queries match too many places to be useful, so they get no suggestions
+SUGGEST_MIN_LENGTH = 3
+
+# Queries at least this long are first matched against our own place names
+LOCAL_SUGGEST_MIN_LENGTH = 4
+
+def local_place_suggestions(query: str, place_names: Dict[str, Any], limit: int = 5) -> Tuple[Dict[str, Any], ...]:
+    """Suggestions for every known place whose name starts with query (lowercase), shortest names first"""
+    names = place_names['names']
+    start = bisect_left(names, query)
+    end = start
+    while end < len(names) and names[end].startswith(query):
+        end += 1
+    
+    matches = sorted(range(start, end), key=lambda i: len(names[i]))
+    return tuple(place_names['suggestions'][i] for i in matches[:limit])
+
+def suggest_locations(query: str) -> Tuple[Dict[str, Any], ...]:
+    """
+    Up to 5 UK location suggestions for a partial query. Answered from the
+    weather locations' place names when any match, otherwise from Nominatim
+    (reusing recent results).
+    """
+    query = query.strip().lower()
+    
+    if len(query) >= LOCAL_SUGGEST_MIN_LENGTH:
+        suggestions = local_place_suggestions(query, LOCATION_INDEX['place_names'])
+        if suggestions:
+            return suggestions
+    
+    return _wait_for_geocode(_geocode_in_background(_suggest_cached, query))
+
+def load_json_mmap(path: str) -> Any:
+    """
+    Parse a JSON file straight from a memory map with orjson, avoiding an
+    intermediate read buffer and the pure-Python json decoder.
+    Raises FileNotFoundError, or ValueError for invalid JSON or an empty file.
+    """
+    with open(path, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+            memoryview(mm) as view:
+        return orjson.loads(view)
 
 def load_weather_data():
     """Load weather data from weather_data.json"""
@@ -36,12 +333,12 @@ def load_weather_data():
         # Get the absolute path to the script directory
         script_dir = os.path.dirname(os.path.abspath(__file__))
         weather_file = os.path.join(script_dir, 'weather', 'weather_data.json')
-        with open(weather_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return load_json_mmap(weather_file)
     except FileNotFoundError:
         print(f"Error: weather_data.json not found at {weather_file}")
         return {"weather_data": []}
-    except json.JSONDecodeError:
+    except ValueError:
+        # orjson.JSONDecodeError is a ValueError, as is mmap's error for an empty file
         print("Error: Invalid JSON in weather_data.json")
         return {"weather_data": []}
 
@@ -50,68 +347,202 @@ def load_grid_boundaries():
     try:
         script_dir = os.path.dirname(os.path.abspath(__file__))
         boundaries_file = os.path.join(script_dir, 'map', 'grid_boundaries.json')
-        with open(boundaries_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return load_json_mmap(boundaries_file)
     except FileNotFoundError:
         print(f"Error: grid_boundaries.json not found")
         return {"cell_boundaries": []}
-    except json.JSONDecodeError:
+    except ValueError:
         print("Error: Invalid JSON in grid_boundaries.json")
         return {"cell_boundaries": []}
 
-def calculate_distance_miles(lat1, lon1, lat2, lon2):
-    """Calculate distance between two points in miles - optimized version"""
-    try:
-        # Use faster haversine calculation instead of geodesic
-        return haversine_distance_miles(lat1, lon1, lat2, lon2)
-    except:
-        return float('inf')
+def build_json_payload(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Serialize a static dataset once so its route can serve bytes directly.
+    Returns the JSON body, a gzipped copy, and an ETag for each.
+    """
+    body = orjson.dumps(data)
+    etag = hashlib.md5(body).hexdigest()
+    return {
+        'body': body,
+        'etag': etag,
+        'gzip_body': gzip.compress(body, 6),
+        'gzip_etag': f"{etag}-gzip"
+    }
 
-def get_cells_within_radius(center_lat, center_lon, radius_miles, grid_data):
-    """Get all grid cells within the specified radius using fast distance calculation"""
-    cells_in_radius = []
+def json_payload_response(payload: Dict[str, Any], max_age: int = 3600):
+    """
+    Serve a payload from build_json_payload with caching headers: gzip when
+    the client accepts it, and 304 Not Modified when its ETag still matches.
+    """
+    if 'gzip' in request.accept_encodings:
+        body, etag = payload['gzip_body'], payload['gzip_etag']
+    else:
+        body, etag = payload['body'], payload['etag']
     
-    for cell in grid_data.get('cell_boundaries', []):
-        center = cell.get('center', {})
-        cell_lat = center.get('latitude')
-        cell_lon = center.get('longitude')
-        
-        if cell_lat is not None and cell_lon is not None:
-            # Use fast haversine distance instead of geodesic
-            distance = haversine_distance_miles(center_lat, center_lon, cell_lat, cell_lon)
-            if distance <= radius_miles:
-                cells_in_radius.append(cell)
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(body, mimetype='application/json')
+        if body is payload['gzip_body']:
+            response.headers['Content-Encoding'] = 'gzip'
     
-    return cells_in_radius
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    return response
+
+# Items serialized per chunk of a streamed JSON list
+STREAM_CHUNK_SIZE = 256
 
+def json_list_chunks(items: Iterable[Any]) -> Iterator[bytes]:
+    """
+    Serialize items STREAM_CHUNK_SIZE at a time, yielding each chunk's elements
+    without the surrounding brackets, ready to be joined into one JSON list.
+    Only one chunk of items is held at a time.
+    """
+    items_iter = iter(items)
+    while chunk := list(islice(items_iter, STREAM_CHUNK_SIZE)):
+        yield orjson.dumps(chunk, option=app.json.options)[1:-1]
+
+def stream_json_list(meta: Dict[str, Any], key: str, chunks: Iterable[bytes]):
+    """
+    Respond with meta plus a JSON list under key, joined from json_list_chunks
+    output while the response is sent, so the full body is never built at once.
+    """
+    def generate():
+        yield orjson.dumps(meta, option=app.json.options)[:-1] + (b',' if meta else b'') + orjson.dumps(key) + b':['
+        separator = b''
+        for chunk in chunks:
+            yield separator + chunk
+            separator = b','
+        yield b']}'
+    
+    return app.response_class(generate(), mimetype='application/json')
+
+def build_grid_index(grid_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Parallel arrays of the grid cells that have a center: row i of the
+    coordinate arrays is cells[i]. Also builds a KD-tree over the centers on
+    the unit sphere, so radius queries only visit nearby cells.
+    """
+    cells = [
+        cell for cell in grid_data.get('cell_boundaries', [])
+        if cell.get('center', {}).get('latitude') is not None and cell.get('center', {}).get('longitude') is not None
+    ]
+    latitudes = np.array([cell['center']['latitude'] for cell in cells], dtype=np.float64)
+    longitudes = np.array([cell['center']['longitude'] for cell in cells], dtype=np.float64)
+    
+    return {
+        'cells': cells,
+        'ids': np.array([cell.get('id') for cell in cells]),
+        'latitudes': latitudes,
+        'longitudes': longitudes,
+        'tree': cKDTree(unit_sphere_xyz(latitudes, longitudes))
+    }
+
+def cell_positions_within_radius(center_lat, center_lon, radius_miles, grid_index) -> List[int]:
+    """Positions (rows of grid_index) of the grid cells within the specified radius (great-circle), in grid order"""
+    # A cell is in range when its distance <= radius_miles, which no cell is for a
+    # negative or NaN radius (the tree would treat a negative one as its absolute value)
+    if not grid_index['cells'] or not radius_miles >= 0:
+        return []
+    
+    # A surface distance of radius_miles is a chord of this length on the unit sphere
+    center_xyz = unit_sphere_xyz(center_lat, center_lon)[0]
+    return grid_index['tree'].query_ball_point(
+        center_xyz, chord_length(radius_miles), return_sorted=True
+    )
+
+def get_cells_within_radius(center_lat, center_lon, radius_miles, grid_index):
+    """Get all grid cells within the specified radius (great-circle), in grid order"""
+    cells = grid_index['cells']
+    return [cells[i] for i in cell_positions_within_radius(center_lat, center_lon, radius_miles, grid_index)]
+
+
+# Reload the weather json at 3:20 am to give the server sufficient time to download the json
+RELOAD_HOUR, RELOAD_MINUTE = 3, 20
+
+def seconds_until_next_reload(now: datetime) -> float:
+    """Seconds from now until the next RELOAD_HOUR:RELOAD_MINUTE, today or tomorrow"""
+    target = now.replace(hour=RELOAD_HOUR, minute=RELOAD_MINUTE, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+def location_index_for(generation: int) -> Dict[str, Any]:
+    """The LOCATION_INDEX snapshot of a data generation: the current one, or the one a reload just replaced"""
+    return _location_indexes[generation]
+
+def schedule_next_reload():
+    """Sleep until the next reload with a single timer, rather than polling the clock"""
+    delay = seconds_until_next_reload(datetime.now())
+    print(f"Next weather data reload in {delay / 3600:.1f} hours")
+    timer = threading.Timer(delay, auto_refresh)
+    timer.daemon = True
+    timer.start()
 
 def auto_refresh():
-    """Background function that runs the weather monitor and checks time"""
-    while True:
-        current_time = datetime.now()
-        global WEATHER_DATA
-        
-        if current_time.hour == 3 and current_time.minute == 20:
-            ## reload the weather json at 3:20 am to give the server sufficient time to download the json
-            print(f"[{current_time.strftime('%Y-%m-%d %H:%M:%S')}] Weather data reloaded at 3:10 AM")
-            WEATHER_DATA = load_weather_data()
-        else:
-            # Print statement every 3 hours (0, 3, 6, 9, 12, 15, 18, 21)
-            if current_time.hour % 3 == 0 and current_time.minute == 0:
-                print(f"[{current_time.strftime('%Y-%m-%d %H:%M:%S')}] Weather data check - next reload at 3:10 AM")
+    """Reload the weather data, then schedule the next reload"""
+    global WEATHER_DATA, WEATHER_DATA_PAYLOAD, LOCATION_INDEX, _location_indexes
+    
+    try:
+        # Build everything from the new file before publishing any of it. Requests
+        # read the data through one LOCATION_INDEX snapshot, and rebinding that
+        # global is atomic, so they see either the old data or the new, never a mix
+        weather_data = load_weather_data()
+        if not weather_data.get('weather_data'):
+            # A missing, unreadable or empty file would otherwise replace good data with nothing
+            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Weather data reload failed, keeping the previous data")
+            return
+        weather_data_payload = build_json_payload(weather_data)
+        generation = LOCATION_INDEX['generation'] + 1
+        location_index = build_location_index(weather_data, generation)
         
-        time.sleep(60)  # Check every minute
+        # Requests that took the old snapshot can still look it up by generation
+        _location_indexes = {LOCATION_INDEX['generation']: LOCATION_INDEX, generation: location_index}
+        WEATHER_DATA, WEATHER_DATA_PAYLOAD, LOCATION_INDEX = weather_data, weather_data_payload, location_index
+        # Cached searches and scores are keyed on the generation they were worked out
+        # from, so one finishing on yesterday's data after the swap is never served
+        # for today's. Clearing just frees yesterday's entries sooner
+        _search_cached.cache_clear()
+        _projection_cached.cache_clear()
+        _window_scores_cached.cache_clear()
+        _sunny_cached.cache_clear()
+        _comfort_cached.cache_clear()
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Weather data reloaded at {RELOAD_HOUR}:{RELOAD_MINUTE:02d} AM")
+    finally:
+        # A failed reload keeps serving the old data and tries again tomorrow
+        schedule_next_reload()
 
 
 # Load the weather data and grid boundaries
 WEATHER_DATA = load_weather_data()
 GRID_BOUNDARIES = load_grid_boundaries()
+GRID_INDEX = build_grid_index(GRID_BOUNDARIES)
+
+# /weather-data and /grid-boundaries are served from bytes serialized once per load
+WEATHER_DATA_PAYLOAD = build_json_payload(WEATHER_DATA)
+GRID_BOUNDARIES_PAYLOAD = build_json_payload(GRID_BOUNDARIES)
 
-# Start the background weather monitor thread
-weather_monitor_thread = threading.Thread(target=auto_refresh, daemon=True)
-weather_monitor_thread.start()
+# Schedule the nightly weather data reload. Threads don't survive a fork, so every
+# process forked from this one (gunicorn workers under preload_app) schedules its own
+schedule_next_reload()
+os.register_at_fork(after_in_child=schedule_next_reload)
 
 
+@app.errorhandler(Exception)
+def handle_unexpected_error(e):
+    """
+    Single JSON 500 for anything a route didn't handle itself, so routes only
+    catch the errors they expect. HTTP errors (404, 405, ...) pass through.
+    """
+    if isinstance(e, HTTPException):
+        return e
+    
+    app.logger.exception(e)
+    return jsonify({"error": "internal"}), 500
+
 @app.route('/')
 def home():
     return render_template('index.html')
@@ -119,38 +550,90 @@ def home():
 @app.route('/location-suggest')
 #this function take user's location input and convert it to coordinates
 def location_suggest():
-    query = request.args.get('q', '')
-    if len(query) < 2:
+    query = request.args.get('q', '').strip()
+    if len(query) < SUGGEST_MIN_LENGTH:
         return jsonify([])
     
     try:
         # Search for locations using Nominatim
-        locations = geolocator.geocode(
-            query,
-            exactly_one=False,
-            limit=5,
-            addressdetails=True,
-            country_codes=['gb']  # Limit to UK
-        )
-        
-        if not locations:
-            return jsonify([])
+        suggestions = suggest_locations(query)
         
-        suggestions = []
-        for loc in locations:
-            if loc.address:
-                suggestions.append({
-                    'display_name': loc.address,
-                    'lat': loc.latitude,
-                    'lon': loc.longitude
-                })
-        
-        return jsonify(suggestions)
+        return jsonify(list(suggestions))
     
-    except GeocoderTimedOut:
+    except GeocoderServiceError:
         return jsonify({"error": "Service temporarily unavailable"}), 503
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+
+# Identical searches within this many seconds reuse the previous result
+SEARCH_CACHE_TTL = 5 * 60
+
+@lru_cache(maxsize=2048)
+def _search_cached(generation: int, start_location: str, travel_date: str, start_hour: int, end_hour: int, max_distance: float, approx_distance: bool, ttl_bucket: int):
+    # Get starting location coordinates
+    start_location_data = geocode_location(start_location)
+    if not start_location_data:
+        return None
+    
+    start_coords = (start_location_data.latitude, start_location_data.longitude)
+    target_date = date.fromisoformat(travel_date)
+    
+    # Rank against the snapshot of the data the search is keyed on
+    location_index_data = location_index_for(generation)
+    
+    # Distance to every destination in one vectorized pass, shared by both rankings.
+    # Destinations outside the max_distance bounding box are skipped (np.inf)
+    distances = distance_miles_within(
+        start_coords[0], start_coords[1],
+        location_index_data['latitudes'], location_index_data['longitudes'],
+        max_distance, approx=approx_distance
+    )
+    forecasts = location_index_data['date_index'].get(travel_date, {})
+    # Window averages for every location, also computed once for both rankings
+    averages = window_averages(location_index_data['forecast_arrays'], travel_date, start_hour, end_hour)
+    
+    # Get top 10 sunny destinations using the sunny_score module
+    sunny_destinations = get_top_sunny_destinations(
+        weather_data=location_index_data['weather_data'],
+        target_date=target_date,
+        start_hour=start_hour,
+        end_hour=end_hour,
+        max_distance=max_distance,
+        start_coords=start_coords,
+        distances=distances,
+        forecasts=forecasts,
+        forecast_arrays=location_index_data['forecast_arrays'],
+        averages=averages
+    )
+    
+    # Get top 10 comfortable destinations using the comfort_index module
+    comfortable_destinations = get_top_comfortable_destinations(
+        weather_data=location_index_data['weather_data'],
+        target_date=target_date,
+        start_hour=start_hour,
+        end_hour=end_hour,
+        max_distance=max_distance,
+        start_coords=start_coords,
+        distances=distances,
+        forecasts=forecasts,
+        forecast_arrays=location_index_data['forecast_arrays'],
+        averages=averages
+    )
+    
+    return {
+        'sunny_destinations': sunny_destinations,
+        'comfortable_destinations': comfortable_destinations
+    }
+
+def search_destinations(start_location: str, travel_date: str, start_hour: int, end_hour: int, max_distance: float):
+    """
+    Top sunny and comfortable destinations within max_distance of start_location
+    on travel_date (YYYY-MM-DD), or None if the start can't be geocoded.
+    Results are reused for SEARCH_CACHE_TTL seconds.
+    """
+    ttl_bucket = int(time.time() // SEARCH_CACHE_TTL)
+    return _search_cached(
+        LOCATION_INDEX['generation'], start_location.strip().lower(), travel_date, start_hour, end_hour, max_distance,
+        app.config['APPROX_DISTANCE'], ttl_bucket
+    )
 
 @app.route('/search', methods=['POST'])
 def search():
@@ -159,84 +642,129 @@ def search():
     try:
         # Get user inputs
         start_location = data['from']
-        travel_date = datetime.strptime(data['date'], '%Y-%m-%d')
+        travel_date = date.fromisoformat(data['date'])
         start_hour = int(data.get('start_hour', 9))
         end_hour = int(data.get('end_hour', 17))
         max_distance = float(data['distance'])
-        
-        # Get starting location coordinates
-        start_location_data = geolocator.geocode(start_location)
-        if not start_location_data:
-            return jsonify({"error": "Starting location not found"}), 400
-        
-        start_coords = (start_location_data.latitude, start_location_data.longitude)
-        
-        # Get top 10 sunny destinations using the sunny_score module
-        sunny_destinations = get_top_sunny_destinations(
-            weather_data=WEATHER_DATA,
-            target_date=travel_date.date(),
-            start_hour=start_hour,
-            end_hour=end_hour,
-            max_distance=max_distance,
-            start_coords=start_coords
+    except KeyError as e:
+        return jsonify({"error": f"Missing field: {e.args[0]}"}), 400
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": f"Invalid input: {str(e)}"}), 400
+    
+    try:
+        results = search_destinations(
+            start_location, travel_date.isoformat(), start_hour, end_hour, max_distance
         )
-        
-        # Get top 10 comfortable destinations using the comfort_index module
-        comfortable_destinations = get_top_comfortable_destinations(
-            weather_data=WEATHER_DATA,
-            target_date=travel_date.date(),
-            start_hour=start_hour,
-            end_hour=end_hour,
-            max_distance=max_distance,
-            start_coords=start_coords
+    except GeocoderServiceError:
+        return jsonify({"error": "Service temporarily unavailable"}), 503
+    
+    if results is None:
+        return jsonify({"error": "Starting location not found"}), 400
+    
+    return jsonify(results)
+
+# Endpoints that clients may combine into a single /batch request
+BATCHABLE_ENDPOINTS = {
+    'location_suggest',
+    'search',
+    'get_hourly_weather',
+    'get_weather_stats',
+    'get_cells_in_radius',
+    'project_weather_index'
+}
+MAX_BATCH_SIZE = 20
+
+# Sub-requests of a batch run concurrently so their geocoder round trips overlap
+_batch_executor = ThreadPoolExecutor(max_workers=8)
+
+def dispatch_batch_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run one /batch sub-request through Flask's normal routing and return its
+    status and body. The body is parsed JSON, or text for non-JSON responses
+    (e.g. Werkzeug's HTML error pages). A malformed item gets a 400 result of
+    its own rather than failing the whole batch.
+    """
+    method = item.get('method', 'GET')
+    query = item.get('query')
+    if not isinstance(method, str) or not isinstance(query, (dict, type(None))):
+        return {'status': 400, 'body': {"error": "method must be a string and query an object"}}
+    
+    try:
+        context = app.test_request_context(
+            item['path'],
+            method=method.upper(),
+            query_string=query,
+            json=item.get('body')
         )
+    except (TypeError, ValueError) as e:
+        return {'status': 400, 'body': {"error": f"Invalid request: {e}"}}
+    
+    with context:
+        if request.url_rule is None or request.url_rule.endpoint not in BATCHABLE_ENDPOINTS:
+            return {'status': 404, 'body': {"error": f"{item['path']} cannot be batched"}}
         
-        return jsonify({
-            'sunny_destinations': sunny_destinations,
-            'comfortable_destinations': comfortable_destinations
-        })
+        response = app.full_dispatch_request()
+        data = response.get_data()
+        body = orjson.loads(data) if response.is_json and data else response.get_data(as_text=True)
+        return {'status': response.status_code, 'body': body}
+
+@app.route('/batch', methods=['POST'])
+def batch():
+    """
+    Run several API requests in one round trip, e.g.
+    [{"path": "/location-suggest", "query": {"q": "Leeds"}},
+     {"path": "/search", "method": "POST", "body": {...}}]
+    Returns one {"status", "body"} result per sub-request, in order.
+    """
+    items = request.get_json(silent=True)
+    
+    if not isinstance(items, list) or not all(isinstance(item, dict) and isinstance(item.get('path'), str) for item in items):
+        return jsonify({"error": "Expected a list of {path, method, query, body} objects"}), 400
     
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"At most {MAX_BATCH_SIZE} requests per batch"}), 400
+    
+    return jsonify(list(_batch_executor.map(dispatch_batch_item, items)))
 
 @app.route('/weather-data')
 def get_weather_data():
     """Return the current weather data"""
-    return jsonify(WEATHER_DATA)
+    return json_payload_response(WEATHER_DATA_PAYLOAD)
 
-@app.route('/hourly-weather/<int:location_index>/<date>')
-def get_hourly_weather(location_index, date):
+@app.route('/hourly-weather/<int:location_index>/<date_str>')
+def get_hourly_weather(location_index, date_str):
     """Get hourly weather data for a specific location and date"""
     try:
+        # Take the locations and their date index from one snapshot, which a reload swaps as a whole
+        location_index_data = LOCATION_INDEX
+        locations = location_index_data['data']
+        
         # Validate location index
-        if location_index < 1 or location_index > len(WEATHER_DATA.get('weather_data', [])):
+        if not 1 <= location_index <= len(locations):
             return jsonify({"error": "Invalid location index"}), 400
         
-        location_data = WEATHER_DATA['weather_data'][location_index - 1]
+        location_data = locations[location_index - 1]
         
         # Find the forecast for the specified date
-        target_date = datetime.strptime(date, '%Y-%m-%d').date()
+        target_date = date.fromisoformat(date_str)
+        forecast = location_index_data['date_index'].get(target_date.isoformat(), {}).get(location_index - 1)
         
-        for forecast in location_data['forecast']:
-            forecast_date = datetime.strptime(forecast['date'], '%Y-%m-%d').date()
-            if forecast_date == target_date:
-                return jsonify({
-                    'location': location_data['location'],
-                    'date': forecast['date'],
-                    'day_summary': forecast['day_summary'],
-                    'astro': forecast['astro'],
-                    'hourly': forecast['hourly']
-                })
+        if forecast is None:
+            return jsonify({"error": "Weather data not found for the specified date"}), 404
         
-        return jsonify({"error": "Weather data not found for the specified date"}), 404
+        return jsonify({
+            'location': location_data['location'],
+            'date': forecast['date'],
+            'day_summary': forecast['day_summary'],
+            'astro': forecast['astro'],
+            'hourly': forecast['hourly']
+        })
         
     except ValueError:
         return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
 
-@app.route('/weather-stats/<int:location_index>/<date>')
-def get_weather_stats(location_index, date):
+@app.route('/weather-stats/<int:location_index>/<date_str>')
+def get_weather_stats(location_index, date_str):
     """Get weather statistics for a specific location, date, and time range"""
     try:
         # Get query parameters for time range
@@ -250,69 +778,77 @@ def get_weather_stats(location_index, date):
         if start_hour >= end_hour:
             return jsonify({"error": "Start hour must be before end hour"}), 400
         
+        # Take the locations and their date index from one snapshot, which a reload swaps as a whole
+        location_index_data = LOCATION_INDEX
+        locations = location_index_data['data']
+        
         # Validate location index
-        if location_index < 1 or location_index > len(WEATHER_DATA.get('weather_data', [])):
+        if not 1 <= location_index <= len(locations):
             return jsonify({"error": "Invalid location index"}), 400
         
-        location_data = WEATHER_DATA['weather_data'][location_index - 1]
+        location_data = locations[location_index - 1]
         
         # Find the forecast for the specified date
-        target_date = datetime.strptime(date, '%Y-%m-%d').date()
-        
-        for forecast in location_data['forecast']:
-            forecast_date = datetime.strptime(forecast['date'], '%Y-%m-%d').date()
-            if forecast_date == target_date:
-                # Use sunny_score module to calculate stats
-                sunny_data = calculate_destination_sunny_score(
-                    location_data, target_date, start_hour, end_hour
-                )
-                
-                # Use comfort_index module to calculate stats
-                comfort_data = calculate_destination_comfort_score(
-                    location_data, target_date, start_hour, end_hour
-                )
-                
-                if sunny_data and comfort_data:
-                    return jsonify({
-                        'location': location_data['location'],
-                        'date': forecast['date'],
-                        'day_summary': forecast['day_summary'],
-                        'sunny_data': sunny_data,
-                        'comfort_data': comfort_data
-                    })
-                else:
-                    return jsonify({"error": "No weather data available for the specified time range"}), 404
-        
-        return jsonify({"error": "Weather data not found for the specified date"}), 404
+        target_date = date.fromisoformat(date_str)
+        forecast = location_index_data['date_index'].get(target_date.isoformat(), {}).get(location_index - 1)
+        
+        if forecast is None:
+            return jsonify({"error": "Weather data not found for the specified date"}), 404
+        
+        # Use sunny_score and comfort_index modules to calculate stats (memoized per location and time range)
+        generation = location_index_data['generation']
+        sunny_data = _sunny_cached(generation, location_index - 1, target_date.isoformat(), start_hour, end_hour)
+        comfort_data = _comfort_cached(generation, location_index - 1, target_date.isoformat(), start_hour, end_hour)
+        
+        if sunny_data and comfort_data:
+            return jsonify({
+                'location': location_data['location'],
+                'date': forecast['date'],
+                'day_summary': forecast['day_summary'],
+                'sunny_data': sunny_data,
+                'comfort_data': comfort_data
+            })
+        else:
+            return jsonify({"error": "No weather data available for the specified time range"}), 404
         
     except ValueError as e:
         return jsonify({"error": f"Invalid input: {str(e)}"}), 400
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
 
-@app.route('/weather-icons/<path:filename>')
-def serve_weather_icon(filename):
-    """Serve weather icons from the icons directory"""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    icons_dir = os.path.join(script_dir, '..', 'icons_and_codes', 'weather_icons')
-    return send_from_directory(icons_dir, filename)
+# The grid never changes while the server runs, so browsers may reuse it for a day
+GRID_BOUNDARIES_MAX_AGE = 24 * 60 * 60
 
 @app.route('/grid-boundaries')
 def get_grid_boundaries():
     """Return the grid boundaries data"""
-    return jsonify(GRID_BOUNDARIES)
+    return json_payload_response(GRID_BOUNDARIES_PAYLOAD, max_age=GRID_BOUNDARIES_MAX_AGE)
 
 @app.route('/cells-in-radius')
 def get_cells_in_radius():
-    """Get grid cells within a specified radius from a center point"""
+    """Get grid cells within a specified radius from a center point (full cells, or columns with format=columns)"""
     try:
         # Get query parameters
         center_lat = float(request.args.get('lat'))
         center_lon = float(request.args.get('lon'))
         radius_miles = float(request.args.get('radius', 200))
         
+        # format=columns returns just the ids and centers as parallel lists; clients
+        # that already have /grid-boundaries don't need every polygon again
+        if request.args.get('format') == 'columns':
+            positions = cell_positions_within_radius(center_lat, center_lon, radius_miles, GRID_INDEX)
+            return jsonify({
+                'center': {
+                    'latitude': center_lat,
+                    'longitude': center_lon
+                },
+                'radius_miles': radius_miles,
+                'total_cells': len(positions),
+                'ids': GRID_INDEX['ids'][positions],
+                'latitudes': GRID_INDEX['latitudes'][positions],
+                'longitudes': GRID_INDEX['longitudes'][positions]
+            })
+        
         # Get cells within radius
-        cells_in_radius = get_cells_within_radius(center_lat, center_lon, radius_miles, GRID_BOUNDARIES)
+        cells_in_radius = get_cells_within_radius(center_lat, center_lon, radius_miles, GRID_INDEX)
         
         return jsonify({
             'center': {
@@ -326,8 +862,46 @@ def get_cells_in_radius():
         
     except (ValueError, TypeError) as e:
         return jsonify({"error": "Invalid parameters. Please provide lat, lon, and radius"}), 400
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+
+@lru_cache(maxsize=64)
+def _projection_cached(generation: int, center_lat: float, center_lon: float, radius_miles: float, index_type: str, date_iso: str, start_hour: int, end_hour: int) -> Tuple[int, Tuple[bytes, ...]]:
+    """
+    Score the grid cells within radius_miles of the center. The cells are kept
+    as serialized JSON chunks (json_list_chunks), so a repeated projection is
+    answered without rebuilding or re-encoding them.
+    Returns (number of cells, chunks).
+    """
+    # Take stations and forecasts from the snapshot the projection is keyed on
+    location_index_data = location_index_for(generation)
+    
+    # Get cells within radius
+    cell_positions = cell_positions_within_radius(center_lat, center_lon, radius_miles, GRID_INDEX)
+    
+    # Step 1: Find closest weather location for every cell in one KD-tree query
+    print(f"Processing {len(cell_positions)} cells...")
+    start_time = time.time()
+    
+    station_positions, station_distances = find_closest_weather_locations(
+        GRID_INDEX['latitudes'][cell_positions], GRID_INDEX['longitudes'][cell_positions], location_index_data
+    )
+    
+    location_time = time.time() - start_time
+    print(f"Location lookup completed in {location_time:.2f}s")
+    
+    # Step 2: Batch calculate scores (each weather location scored once), serializing
+    # the cells as they are produced
+    start_time = time.time()
+    cells = (GRID_INDEX['cells'][i] for i in cell_positions)
+    cells_with_scores = batch_calculate_scores(
+        cells, station_positions, station_distances, index_type, date.fromisoformat(date_iso), start_hour, end_hour,
+        location_index_data
+    )
+    cell_chunks = tuple(json_list_chunks(cells_with_scores))
+    
+    score_time = time.time() - start_time
+    print(f"Score calculation completed in {score_time:.2f}s for {len(cell_positions)} cells")
+    
+    return len(cell_positions), cell_chunks
 
 @app.route('/project-weather-index')
 def project_weather_index():
@@ -338,7 +912,7 @@ def project_weather_index():
         center_lon = float(request.args.get('lon'))
         radius_miles = float(request.args.get('radius', 200))
         index_type = request.args.get('index_type', 'sunny')  # 'sunny' or 'comfort'
-        target_date = request.args.get('date', datetime.now().strftime('%Y-%m-%d'))
+        target_date = request.args.get('date', date.today().isoformat())
         start_hour = int(request.args.get('start_hour', 9))
         end_hour = int(request.args.get('end_hour', 17))
         
@@ -353,53 +927,15 @@ def project_weather_index():
             return jsonify({"error": "Start hour must be before end hour"}), 400
         
         # Parse target date
-        target_date_obj = datetime.strptime(target_date, '%Y-%m-%d').date()
+        target_date_obj = date.fromisoformat(target_date)
         
-        # Get cells within radius
-        cells_in_radius = get_cells_within_radius(center_lat, center_lon, radius_miles, GRID_BOUNDARIES)
-        
-        # Step 1: Find closest weather location for each cell (vectorized)
-        print(f"Processing {len(cells_in_radius)} cells...")
-        start_time = time.time()
-        
-        cells_with_locations = []
-        for cell in cells_in_radius:
-            cell_center = cell.get('center', {})
-            cell_lat = cell_center.get('latitude')
-            cell_lon = cell_center.get('longitude')
-            
-            if cell_lat is None or cell_lon is None:
-                continue
-            
-            # Find the closest weather data location (cached)
-            closest_location_data, distance = find_closest_weather_location_fast(cell_lat, cell_lon, LOCATION_INDEX)
-            
-            # Skip cells that are too far from any weather station (>50 miles)
-            if closest_location_data and distance <= 50:
-                cells_with_locations.append({
-                    'cell': cell,
-                    'location_data': closest_location_data,
-                    'distance': distance
-                })
-            else:
-                # Add cell with no data for very distant cells
-                cells_with_locations.append({
-                    'cell': cell,
-                    'location_data': None,
-                    'distance': float('inf')
-                })
-        
-        location_time = time.time() - start_time
-        print(f"Location lookup completed in {location_time:.2f}s")
-        
-        # Step 2: Batch calculate scores (grouped by weather location to avoid redundancy)
-        start_time = time.time()
-        cells_with_scores = batch_calculate_scores(cells_with_locations, index_type, target_date_obj, start_hour, end_hour)
-        
-        score_time = time.time() - start_time
-        print(f"Score calculation completed in {score_time:.2f}s for {len(cells_with_scores)} cells")
+        # Repeated projections (e.g. switching between sunny and comfort and back) come from the cache
+        total_cells, cell_chunks = _projection_cached(
+            LOCATION_INDEX['generation'], center_lat, center_lon, radius_miles, index_type,
+            target_date_obj.isoformat(), start_hour, end_hour
+        )
         
-        return jsonify({
+        return stream_json_list({
             'center': {
                 'latitude': center_lat,
                 'longitude': center_lon
@@ -408,14 +944,11 @@ def project_weather_index():
             'index_type': index_type,
             'target_date': target_date,
             'time_range': f"{start_hour:02d}:00-{end_hour:02d}:00",
-            'total_cells': len(cells_with_scores),
-            'cells': cells_with_scores
-        })
+            'total_cells': total_cells
+        }, 'cells', cell_chunks)
         
     except (ValueError, TypeError) as e:
         return jsonify({"error": f"Invalid parameters: {str(e)}"}), 400
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
 
 @app.route('/projection-progress')
 def projection_progress():
@@ -423,23 +956,21 @@ def projection_progress():
     return jsonify({
         'status': 'ready',
         'cache_stats': {
-            'distance_cache_size': len(_distance_cache),
-            'location_cache_size': len(_closest_location_cache),
-            'score_cache_size': len(_score_cache)
+            'score_cache_size': _sunny_cached.cache_info().currsize + _comfort_cached.cache_info().currsize
         }
     })
 
 @app.route('/clear-cache')
 def clear_cache():
     """Clear performance caches (useful for development)"""
-    global _distance_cache, _closest_location_cache, _score_cache
-    _distance_cache.clear()
-    _closest_location_cache.clear()
-    _score_cache.clear()
-    
     # Clear LRU caches
-    cached_distance_miles.cache_clear()
-    cached_weather_score.cache_clear()
+    _projection_cached.cache_clear()
+    _window_scores_cached.cache_clear()
+    _sunny_cached.cache_clear()
+    _comfort_cached.cache_clear()
+    _geocode_cached.cache_clear()
+    _suggest_cached.cache_clear()
+    _search_cached.cache_clear()
     
     return jsonify({'status': 'Cache cleared successfully'})
 
@@ -457,152 +988,220 @@ def haversine_distance_miles(lat1: float, lon1: float, lat2: float, lon2: float)
     a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
     c = 2 * np.arcsin(np.sqrt(a))
     
-    # Radius of earth in miles
-    r = 3956
-    return c * r
-
-@lru_cache(maxsize=10000)
-def cached_distance_miles(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """Cached version of distance calculation"""
-    cache_key = f"{lat1:.4f},{lon1:.4f},{lat2:.4f},{lon2:.4f}"
-    if cache_key in _distance_cache:
-        return _distance_cache[cache_key]
-    
-    distance = haversine_distance_miles(lat1, lon1, lat2, lon2)
-    _distance_cache[cache_key] = distance
-    return distance
+    return c * EARTH_RADIUS_MILES
 
-def build_location_index(weather_data: Dict[str, Any]) -> Dict[str, Any]:
+def build_location_index(weather_data: Dict[str, Any], generation: int) -> Dict[str, Any]:
     """
     Build a spatial index of weather locations for fast lookup.
-    Returns a dict with location data and coordinates for quick access.
+    Returns a dict of parallel arrays (struct-of-arrays) where row i of every
+    entry describes weather_data['weather_data'][i]. generation numbers the
+    loaded dataset; cached results derived from it are keyed on it.
     """
-    location_index = {
-        'locations': [],
-        'coordinates': [],
-        'data': []
+    locations = weather_data.get('weather_data', [])
+    latitudes, longitudes = location_coordinates(weather_data)
+    
+    # Several locations share a point; keep the first at each so the nearest-station
+    # tree resolves ties to the lowest position, like a linear argmin scan
+    _, station_positions = np.unique(np.column_stack((latitudes, longitudes)), axis=0, return_index=True)
+    station_positions.sort()
+    
+    return {
+        'generation': generation,
+        # The dataset this index was built from; reloads replace both together
+        'weather_data': weather_data,
+        'data': locations,
+        # Coordinate arrays for vectorized distance calculations
+        'latitudes': latitudes,
+        'longitudes': longitudes,
+        # Nearest-station lookups: KD-tree over distinct points on the unit sphere,
+        # with the location position of each tree point
+        'station_positions': station_positions,
+        'station_tree': cKDTree(unit_sphere_xyz(latitudes[station_positions], longitudes[station_positions])),
+        # Forecasts grouped by date for O(1) lookup of a given day
+        'date_index': build_date_index(weather_data),
+        # Hourly readings as (location, date, hour) arrays for vectorized scoring
+        'forecast_arrays': build_forecast_arrays(weather_data),
+        # Sorted place names for prefix lookups in /location-suggest
+        'place_names': build_place_name_index(weather_data)
     }
+
+def build_place_name_index(weather_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a local gazetteer of the UK weather locations for /location-suggest.
+    Returns parallel lists sorted by lowercase name, so a prefix is one bisect away.
+    """
+    places = {}
     
-    for idx, location_data in enumerate(weather_data.get('weather_data', [])):
+    for location_data in weather_data.get('weather_data', []):
         location = location_data['location']
-        lat, lon = location['latitude'], location['longitude']
+        # Nominatim suggestions are limited to the UK, so keep local ones to match
+        if location['country'] != 'United Kingdom':
+            continue
         
-        location_index['locations'].append(location)
-        location_index['coordinates'].append((lat, lon))
-        location_index['data'].append(location_data)
+        parts = [location['name']]
+        if location['region'] and location['region'] != location['name']:
+            parts.append(location['region'])
+        parts.append(location['country'])
+        display_name = ', '.join(parts)
+        
+        places.setdefault(display_name, (location['name'].lower(), {
+            'display_name': display_name,
+            'lat': location['latitude'],
+            'lon': location['longitude']
+        }))
+    
+    entries = sorted(places.values(), key=lambda entry: entry[0])
+    return {
+        'names': [name for name, _ in entries],
+        'suggestions': [suggestion for _, suggestion in entries]
+    }
+
+def find_closest_weather_locations(lats: np.ndarray, lons: np.ndarray, location_index: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Closest weather location to each of many points, from one KD-tree query.
+    Returns (positions in location_index['data'], distances in miles); distances
+    are inf when there are no locations.
+    """
+    if not len(location_index['station_positions']):
+        return np.zeros(len(lats), dtype=np.intp), np.full(len(lats), np.inf)
     
-    return location_index
+    _, nearest = location_index['station_tree'].query(unit_sphere_xyz(lats, lons))
+    positions = location_index['station_positions'][nearest]
+    distances = haversine_distance_miles(
+        lats, lons, location_index['latitudes'][positions], location_index['longitudes'][positions]
+    )
+    return positions, distances
 
 def find_closest_weather_location_fast(target_lat: float, target_lon: float, location_index: Dict[str, Any]) -> Tuple[Any, float]:
     """
-    Fast closest location finder using pre-built index and vectorized calculations.
+    Fast closest location finder using the pre-built KD-tree.
     Returns (location_data, distance) or (None, float('inf'))
     """
-    cache_key = f"{target_lat:.4f},{target_lon:.4f}"
-    if cache_key in _closest_location_cache:
-        return _closest_location_cache[cache_key]
-    
-    if not location_index['coordinates']:
+    if not location_index['data']:
         return None, float('inf')
     
-    # Vectorized distance calculation using numpy
-    coords = np.array(location_index['coordinates'])
-    target = np.array([target_lat, target_lon])
-    
-    # Calculate distances to all locations at once
-    distances = np.array([
-        haversine_distance_miles(target_lat, target_lon, lat, lon)
-        for lat, lon in coords
-    ])
-    
-    # Find the closest
-    min_idx = np.argmin(distances)
-    closest_location = location_index['data'][min_idx]
-    min_distance = distances[min_idx]
-    
-    # Cache the result
-    _closest_location_cache[cache_key] = (closest_location, min_distance)
-    return closest_location, min_distance
+    positions, distances = find_closest_weather_locations(
+        np.array([target_lat]), np.array([target_lon]), location_index
+    )
+    return location_index['data'][positions[0]], distances[0]
 
-@lru_cache(maxsize=1000)
-def cached_weather_score(location_name: str, target_date: str, start_hour: int, end_hour: int, index_type: str) -> Tuple[float, str]:
+@lru_cache(maxsize=64)
+def _window_scores_cached(generation: int, date_iso: str, start_hour: int, end_hour: int):
     """
-    Cached weather score calculation to avoid recalculating for the same location/parameters.
+    Every location's sunny and comfort scores for one window of a data
+    generation, averaged and scored in one vectorized pass and shared by all
+    lookups for that window.
+    Returns {'hours', 'sunny', 'comfort'}, or None if date_iso has no forecasts.
     """
-    cache_key = f"{location_name}_{target_date}_{start_hour}_{end_hour}_{index_type}"
-    if cache_key in _score_cache:
-        return _score_cache[cache_key]
+    averages = window_averages(location_index_for(generation)['forecast_arrays'], date_iso, start_hour, end_hour)
+    if averages is None:
+        return None
+    return {
+        'hours': averages['hours'],
+        'sunny': calculate_sunny_scores(averages),
+        'comfort': calculate_comfort_scores(averages)
+    }
+
+def _window_inputs(location_index_data: Dict[str, Any], location_position: int, date_iso: str, start_hour: int, end_hour: int):
+    """
+    A window's scores and one location's hour dicts for it, sliced from the
+    flattened forecast arrays rather than parsed out of its hourly dicts.
+    Returns (window_scores, hourly_data), or None when it has no readings in the window.
+    """
+    forecast = location_index_data['date_index'].get(date_iso, {}).get(location_position)
+    # Scores and hour dicts both come from location_index_data's generation
+    window_scores = _window_scores_cached(location_index_data['generation'], date_iso, start_hour, end_hour)
+    if forecast is None or window_scores is None or not window_scores['hours'][location_position]:
+        return None
     
-    # This should not be called - just a fallback
-    return 0.0, 'No Data'
+    hourly_data = window_hourly_data(
+        location_index_data['forecast_arrays'], forecast, location_position, date_iso, start_hour, end_hour
+    )
+    return window_scores, hourly_data
+
+# Scores are keyed by data generation and location position (0-based row in that
+# generation's weather data)
+@lru_cache(maxsize=8192)
+def _sunny_cached(generation: int, location_position: int, date_iso: str, start_hour: int, end_hour: int):
+    """Cached sunny score (as calculate_destination_sunny_score) for one location, date and time range"""
+    inputs = _window_inputs(location_index_for(generation), location_position, date_iso, start_hour, end_hour)
+    if inputs is None:
+        return None
+    window_scores, hourly_data = inputs
+    return sunny_score_summary(window_scores['sunny'], location_position, start_hour, end_hour, hourly_data)
 
-def batch_calculate_scores(cells_with_locations: List[Dict], index_type: str, target_date_obj, start_hour: int, end_hour: int) -> List[Dict]:
+@lru_cache(maxsize=8192)
+def _comfort_cached(generation: int, location_position: int, date_iso: str, start_hour: int, end_hour: int):
+    """Cached comfort score (as calculate_destination_comfort_score) for one location, date and time range"""
+    inputs = _window_inputs(location_index_for(generation), location_position, date_iso, start_hour, end_hour)
+    if inputs is None:
+        return None
+    window_scores, hourly_data = inputs
+    return comfort_score_summary(window_scores['comfort'], location_position, start_hour, end_hour, hourly_data)
+
+# Cells further than this from every weather station are shown without data
+MAX_STATION_DISTANCE_MILES = 50
+
+def batch_calculate_scores(cells: Iterable[Dict], station_positions: np.ndarray, station_distances: np.ndarray, index_type: str, target_date_obj, start_hour: int, end_hour: int, location_index: Dict[str, Any]) -> Iterator[Dict]:
     """
-    Batch calculate scores for multiple cells, grouping by weather location to minimize redundant calculations.
+    Score grid cells by their closest weather location (positions and distances
+    parallel to cells). Each location is scored once, however many cells it
+    covers, up front; the scored cells are then produced lazily in cell order.
     """
-    # Group cells by their closest weather location
-    location_groups = {}
-    for cell_info in cells_with_locations:
-        cell, location_data, distance = cell_info['cell'], cell_info['location_data'], cell_info['distance']
-        location_name = location_data['location']['name'] if location_data else 'Unknown'
+    locations = location_index['data']
+    date_iso = target_date_obj.isoformat()
+    
+    # Cells that are too far from any weather station (>50 miles) get no data
+    in_range = station_distances <= MAX_STATION_DISTANCE_MILES
+    stations, cell_stations = np.unique(station_positions[in_range], return_inverse=True)
+    
+    if index_type == 'sunny':
+        calculate, score_key, level_key = _sunny_cached, 'sunny_score', 'sunny_level'
+    else:  # comfort
+        calculate, score_key, level_key = _comfort_cached, 'comfort_score', 'comfort_level'
+    
+    # Calculate score once per weather location
+    station_scores = []
+    for station in stations:
+        score_data = calculate(location_index['generation'], int(station), date_iso, start_hour, end_hour)
+        station_scores.append((
+            round(score_data[score_key], 2) if score_data else 0,
+            score_data[level_key] if score_data else 'No Data',
+            locations[station]['location']['name']
+        ))
+    
+    return _scored_cells(cells, station_distances, in_range, station_scores, cell_stations, index_type)
+
+def _scored_cells(cells, station_distances, in_range, station_scores, cell_stations, index_type):
+    """Copy each cell with its station's score, or 'No Data' when it has no station in range"""
+    cell_stations = iter(cell_stations)
+    for cell, distance, has_station in zip(cells, station_distances, in_range):
+        cell_with_score = cell.copy()
         
-        if location_name not in location_groups:
-            location_groups[location_name] = {
-                'location_data': location_data,
-                'cells': [],
-                'distance': distance
+        if has_station:
+            score, level, location_name = station_scores[next(cell_stations)]
+            cell_with_score['weather_score'] = {
+                'score': score,
+                'level': level,
+                'index_type': index_type,
+                'closest_location': location_name,
+                'distance_to_station': round(distance, 1)
             }
-        location_groups[location_name]['cells'].append(cell)
-    
-    # Calculate score once per location group
-    results = []
-    for location_name, group in location_groups.items():
-        location_data = group['location_data']
-        distance = group['distance']
-        
-        if location_data:
-            # Calculate score once for this location
-            if index_type == 'sunny':
-                score_data = calculate_destination_sunny_score(
-                    location_data, target_date_obj, start_hour, end_hour
-                )
-                score = score_data['sunny_score'] if score_data else 0
-                level = score_data['sunny_level'] if score_data else 'No Data'
-            else:  # comfort
-                score_data = calculate_destination_comfort_score(
-                    location_data, target_date_obj, start_hour, end_hour
-                )
-                score = score_data['comfort_score'] if score_data else 0
-                level = score_data['comfort_level'] if score_data else 'No Data'
-            
-            # Apply this score to all cells in this group
-            for cell in group['cells']:
-                cell_with_score = cell.copy()
-                cell_with_score['weather_score'] = {
-                    'score': round(score, 2),
-                    'level': level,
-                    'index_type': index_type,
-                    'closest_location': location_name,
-                    'distance_to_station': round(distance, 1) if distance != float('inf') else None
-                }
-                results.append(cell_with_score)
         else:
             # No weather data available
-            for cell in group['cells']:
-                cell_with_score = cell.copy()
-                cell_with_score['weather_score'] = {
-                    'score': 0,
-                    'level': 'No Data',
-                    'index_type': index_type,
-                    'closest_location': 'Unknown',
-                    'distance_to_station': None
-                }
-                results.append(cell_with_score)
-    
-    return results
+            cell_with_score['weather_score'] = {
+                'score': 0,
+                'level': 'No Data',
+                'index_type': index_type,
+                'closest_location': 'Unknown',
+                'distance_to_station': None
+            }
+        yield cell_with_score
 
 # Build location index on startup for fast lookups
-LOCATION_INDEX = build_location_index(WEATHER_DATA)
+LOCATION_INDEX = build_location_index(WEATHER_DATA, 0)
+_location_indexes = {0: LOCATION_INDEX}
 
 if __name__ == '__main__':
-    app.run(host="0.0.0.0", port=80, debug=True)
+    # Development server only - production runs under gunicorn (see gunicorn.conf.py)
+    app.run(host="0.0.0.0", port=80, threaded=True)
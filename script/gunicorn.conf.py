@@ -0,0 +1,28 @@
+# Production server settings. Run from the script directory with:
+#   gunicorn app:app
+import multiprocessing
+
+bind = "0.0.0.0:80"
+
+# One process per core; threads let a worker keep serving while a request waits on Nominatim.
+# gthread rather than gevent: geocoding already runs on the app's own thread pool, and
+# the NumPy scoring in /search would block a gevent loop for its whole run anyway
+workers = multiprocessing.cpu_count()
+worker_class = "gthread"
+threads = 8
+
+# Load the weather data and indexes once in the master and fork the workers from it,
+# so they share those pages copy-on-write. The master and each worker schedule their
+# own nightly reload (see app.py)
+preload_app = True
+
+# Recycle workers now and then to return memory a long-running process has built up.
+# The replacement is forked from the master, which has reloaded the same night's data,
+# and the jitter keeps the workers from all restarting at once
+max_requests = 1000
+max_requests_jitter = 100
+
+# Keep browser connections open between the map's follow-up requests
+keepalive = 5
+
+timeout = 60
@@ -1,9 +1,11 @@
-import json
 import numpy as np
+import orjson
 import matplotlib.pyplot as plt
 from matplotlib.patches import Rectangle
+from matplotlib.collections import PolyCollection
 from pyproj import Transformer, CRS
-from shapely.geometry import Point, box
+import shapely
+from shapely.geometry import box
 import geopandas as gpd
 import requests
 from pathlib import Path
@@ -20,6 +22,12 @@ def download_world_data():
     
     url = "https://naciscdn.org/naturalearth/110m/cultural/ne_110m_admin_0_countries.zip"
     zip_path = data_dir / "ne_110m_admin_0_countries.zip"
+    shapefile_path = data_dir / "ne_110m_admin_0_countries.shp"
+    
+    # Reuse a previous download
+    if shapefile_path.exists():
+        print("Using existing world boundaries data")
+        return shapefile_path
     
     print("Downloading world boundaries data...")
     response = requests.get(url)
@@ -32,7 +40,7 @@ def download_world_data():
         zip_ref.extractall(data_dir)
     
     print("Data downloaded and extracted successfully")
-    return data_dir / "ne_110m_admin_0_countries.shp"
+    return shapefile_path
 
 
 
@@ -65,30 +73,6 @@ def get_location_name(lat, lon, geolocator):
     
     return 'Unknown'
 
-def generate_cell_boundaries(center_x, center_y, grid_size, to_wgs84):
-    """Generate boundary coordinates for a grid cell"""
-    # Calculate the four corners of the cell in British National Grid coordinates
-    half_size = grid_size / 2
-    
-    # Define the four corners (clockwise from top-left)
-    corners_bng = [
-        (center_x - half_size, center_y + half_size),  # Top-left
-        (center_x + half_size, center_y + half_size),  # Top-right
-        (center_x + half_size, center_y - half_size),  # Bottom-right
-        (center_x - half_size, center_y - half_size),  # Bottom-left
-    ]
-    
-    # Convert corners to WGS84 (lat/lon)
-    corners_wgs84 = []
-    for corner_x, corner_y in corners_bng:
-        lon, lat = to_wgs84.transform(corner_x, corner_y)
-        corners_wgs84.append({
-            'latitude': round(lat, 6),
-            'longitude': round(lon, 6)
-        })
-    
-    return corners_wgs84
-
 def generate_and_visualize_uk_ireland_grid():
     print("Starting grid generation...")
     
@@ -109,6 +93,10 @@ def generate_and_visualize_uk_ireland_grid():
     uk_ireland = world[world['NAME'].isin(['United Kingdom', 'Ireland'])]
     uk_ireland = uk_ireland.to_crs(bng)
     
+    # Dissolve both countries into one prepared geometry for the land test
+    land = shapely.union_all(uk_ireland.geometry.values)
+    shapely.prepare(land)
+    
     # Get bounds in meters
     bounds = uk_ireland.total_bounds
     
@@ -123,49 +111,52 @@ def generate_and_visualize_uk_ireland_grid():
     grid_boundaries = []
     
     print(f"Generating grid: {x_cells} x {y_cells} cells")
-    total_cells = x_cells * y_cells
-    cells_processed = 0
-    
-    # Generate grid
-    for i in range(x_cells):
-        for j in range(y_cells):
-            cells_processed += 1
-            if cells_processed % 100 == 0:
-                print(f"Progress: {cells_processed}/{total_cells} cells processed")
-                
-            # Calculate cell bounds
-            x_min = bounds[0] + (i * grid_size)
-            y_min = bounds[1] + (j * grid_size)
-            center_x = x_min + (grid_size / 2)
-            center_y = y_min + (grid_size / 2)
-            
-            # Create point and check if it intersects with UK/Ireland
-            point = Point(center_x, center_y)
-            
-            if uk_ireland.geometry.contains(point).any():
-                
-                # Convert center point back to lat/lon
-                lon, lat = to_wgs84.transform(center_x, center_y)
-                
-                # Generate boundary coordinates for this cell
-                boundaries = generate_cell_boundaries(center_x, center_y, grid_size, to_wgs84)
-                
-                cell_id = len(grid_cells)
-                
-                grid_cells.append({
-                    'id': cell_id,
-                    'latitude': round(lat, 6),
-                    'longitude': round(lon, 6)
-                })
-                
-                grid_boundaries.append({
-                    'id': cell_id,
-                    'center': {
-                        'latitude': round(lat, 6),
-                        'longitude': round(lon, 6)
-                    },
-                    'boundaries': boundaries
-                })
+    
+    # Centres of every cell in the bounding box, flattened column by column
+    # (west to east, then south to north) - the order cell ids are given in
+    x_centers = bounds[0] + (np.arange(x_cells) * grid_size) + (grid_size / 2)
+    y_centers = bounds[1] + (np.arange(y_cells) * grid_size) + (grid_size / 2)
+    all_x, all_y = np.meshgrid(x_centers, y_centers, indexing='ij')
+    all_x, all_y = all_x.ravel(), all_y.ravel()
+    
+    # Keep the cells whose centre lies inside the UK or Ireland, testing all
+    # centres in a single vectorized GEOS call
+    on_land = shapely.contains_xy(land, all_x, all_y)
+    
+    center_x, center_y = all_x[on_land], all_y[on_land]
+    
+    # Four corners of every cell in British National Grid coordinates,
+    # one row per cell (clockwise from top-left)
+    half_size = grid_size / 2
+    corner_x = center_x[:, np.newaxis] + np.array([-half_size, half_size, half_size, -half_size])
+    corner_y = center_y[:, np.newaxis] + np.array([half_size, half_size, -half_size, -half_size])
+    
+    # Convert all centres, then all corners, back to lat/lon in one call each
+    center_lons, center_lats = to_wgs84.transform(center_x, center_y)
+    corner_lons, corner_lats = to_wgs84.transform(corner_x.ravel(), corner_y.ravel())
+    corner_lons, corner_lats = corner_lons.reshape(-1, 4), corner_lats.reshape(-1, 4)
+    
+    cells = zip(center_lats.tolist(), center_lons.tolist(), corner_lats.tolist(), corner_lons.tolist())
+    for cell_id, (lat, lon, cell_corner_lats, cell_corner_lons) in enumerate(cells):
+        boundaries = [
+            {'latitude': round(corner_lat, 6), 'longitude': round(corner_lon, 6)}
+            for corner_lat, corner_lon in zip(cell_corner_lats, cell_corner_lons)
+        ]
+        
+        grid_cells.append({
+            'id': cell_id,
+            'latitude': round(lat, 6),
+            'longitude': round(lon, 6)
+        })
+        
+        grid_boundaries.append({
+            'id': cell_id,
+            'center': {
+                'latitude': round(lat, 6),
+                'longitude': round(lon, 6)
+            },
+            'boundaries': boundaries
+        })
     
     # Save to JSON
     output = {
@@ -185,13 +176,13 @@ def generate_and_visualize_uk_ireland_grid():
     
     # Save locations.json inside the map directory
     output_json_path = Path(__file__).parent / 'locations.json'
-    with open(output_json_path, 'w') as f:
-        json.dump(output, f, indent=2)
+    with open(output_json_path, 'wb') as f:
+        f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
     
     # Save grid boundaries to separate file
     boundaries_json_path = Path(__file__).parent / 'grid_boundaries.json'
-    with open(boundaries_json_path, 'w') as f:
-        json.dump(boundaries_output, f, indent=2)
+    with open(boundaries_json_path, 'wb') as f:
+        f.write(orjson.dumps(boundaries_output, option=orjson.OPT_INDENT_2))
     
     # Visualization part
     print("Creating visualization...")
@@ -199,33 +190,20 @@ def generate_and_visualize_uk_ireland_grid():
     # Create figure and axis
     fig, ax = plt.subplots(figsize=(12, 15))
     
-    # Extract coordinates
-    lats = [cell['latitude'] for cell in grid_cells]
-    lons = [cell['longitude'] for cell in grid_cells]
+    # Calculate grid dimensions from the cell centres
+    min_lat, max_lat = center_lats.min(), center_lats.max()
+    min_lon, max_lon = center_lons.min(), center_lons.max()
     
-    # Calculate grid dimensions
-    min_lat, max_lat = min(lats), max(lats)
-    min_lon, max_lon = min(lons), max(lons)
+    # Outline of each grid cell in plot coordinates, shape (cells, 4 corners, x/y)
+    plot_x = (corner_lons - min_lon) / (max_lon - min_lon)
+    plot_y = (corner_lats - min_lat) / (max_lat - min_lat)
+    cell_polygons = np.stack([plot_x, plot_y], axis=-1)
     
-    # Plot each grid cell with boundaries
-    for boundary_data in grid_boundaries:
-        boundaries = boundary_data['boundaries']
-        
-        # Extract boundary coordinates
-        boundary_lons = [point['longitude'] for point in boundaries]
-        boundary_lats = [point['latitude'] for point in boundaries]
-        
-        # Convert to plot coordinates
-        plot_x = [(lon - min_lon) / (max_lon - min_lon) for lon in boundary_lons]
-        plot_y = [(lat - min_lat) / (max_lat - min_lat) for lat in boundary_lats]
-        
-        # Create polygon from boundaries
-        from matplotlib.patches import Polygon
-        polygon = Polygon(list(zip(plot_x, plot_y)), 
-                         facecolor='forestgreen', 
-                         edgecolor='white',
-                         linewidth=0.5)
-        ax.add_patch(polygon)
+    # Draw every cell as one collection rather than one patch per cell
+    ax.add_collection(PolyCollection(cell_polygons,
+                                     facecolor='forestgreen',
+                                     edgecolor='white',
+                                     linewidth=0.5))
     
     # Set plot limits
     ax.set_xlim(-0.01, 1.01)
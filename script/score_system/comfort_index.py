@@ -1,5 +1,10 @@
+import numpy as np
 import pandas as pd
-from datetime import datetime
+
+from forecast_arrays import window_averages, window_hourly_data
+from forecast_index import build_date_index
+from geo_distance import distance_miles_within, location_coordinates
+from ranking import top_unique_cities
 
 # -------------------------------
 # Normalization functions
@@ -18,96 +23,114 @@ from datetime import datetime
 # The purpose of this formular is to normalised the weather parameters into an comparable system and find the location of the given value in a pre-set score range
 
 
+# Each normalize_* function takes a value or a NumPy array of values (one per
+# location) and returns the normalized score(s) as an array. np.select picks the
+# first matching range, in the same order as the if/elif ladders they replace
+
 def normalize_cloud_comfort(value):
     ##cloud coverage index
-    if value <= 10:
-        return 7 + (10 - 7) * (10 - value) / 10 ## too much sun and no cloud is not a good thing, there fore we have the range of 7 to 10
-    elif value <= 30:
-        return 9 + (10 - 9) * (30 - value) / 20
-    elif value <= 50:
-        return 7 + (9 - 7) * (50 - value) / 20
-    elif value <= 80:
-        return 4 + (7 - 4) * (80 - value) / 30
-    else:
-        return max(0, 0 + (4 - 0) * (100 - value) / 20)
+    value = np.asarray(value, dtype=float)
+    return np.select(
+        [value <= 10, value <= 30, value <= 50, value <= 80],
+        [
+            7 + (10 - 7) * (10 - value) / 10, ## too much sun and no cloud is not a good thing, there fore we have the range of 7 to 10
+            9 + (10 - 9) * (30 - value) / 20,
+            7 + (9 - 7) * (50 - value) / 20,
+            4 + (7 - 4) * (80 - value) / 30
+        ],
+        np.maximum(0, 0 + (4 - 0) * (100 - value) / 20)
+    )
 
 def normalize_uv_comfort(value):
     ##uv index in relation to the comfort index
-    if value <= 2:
-        return 10
-    elif value <= 5:
-        return 8 + (10 - 8) * (5 - value) / 3
-    elif value <= 7:
-        return 5 + (7 - 5) * (7 - value) / 2
-    elif value <= 10:
-        return 3 + (5 - 3) * (10 - value) / 3
-    else:
-        return max(0, 0 + (3 - 0) * (12 - min(value,12)) / 2)
+    value = np.asarray(value, dtype=float)
+    return np.select(
+        [value <= 2, value <= 5, value <= 7, value <= 10],
+        [
+            10,
+            8 + (10 - 8) * (5 - value) / 3,
+            5 + (7 - 5) * (7 - value) / 2,
+            3 + (5 - 3) * (10 - value) / 3
+        ],
+        np.maximum(0, 0 + (3 - 0) * (12 - np.minimum(value, 12)) / 2)
+    )
 
 def normalize_visibility_comfort(value):
     ## the more the better
-    if value > 30000:
-        return 10
-    elif value > 10000:
-        return 8 + (10 - 8) * (value - 10000) / 20000
-    elif value > 4000:
-        return 5 + (8 - 5) * (value - 4001) / (10000 - 4001)
-    elif value > 1000:
-        return 2 + (5 - 2) * (value - 1001) / (4000 - 1001)
-    else:
-        return 0.0
+    value = np.asarray(value, dtype=float)
+    return np.select(
+        [value > 30000, value > 10000, value > 4000, value > 1000],
+        [
+            10,
+            8 + (10 - 8) * (value - 10000) / 20000,
+            5 + (8 - 5) * (value - 4001) / (10000 - 4001),
+            2 + (5 - 2) * (value - 1001) / (4000 - 1001)
+        ],
+        0.0
+    )
 
 def normalize_rain_comfort(value):
     ## no rain is the best, light rain is accetable
-    if value == 0.0:
-        return 10.0
-    elif value <= 0.9:
-        return 8 + (9 - 8) * (0.9 - value) / 0.9
-    elif value <= 10:
-        return 5 + (8 - 5) * (10 - value) / 9
-    elif value <= 30:
-        return 2 + (5 - 2) * (30 - value) / 19
-    else:
-        return max(0, 0 + (2 - 0) * (70 - min(value,70)) / 40)
+    value = np.asarray(value, dtype=float)
+    return np.select(
+        [value == 0.0, value <= 0.9, value <= 10, value <= 30],
+        [
+            10.0,
+            8 + (9 - 8) * (0.9 - value) / 0.9,
+            5 + (8 - 5) * (10 - value) / 9,
+            2 + (5 - 2) * (30 - value) / 19
+        ],
+        np.maximum(0, 0 + (2 - 0) * (70 - np.minimum(value, 70)) / 40)
+    )
 
 def normalize_snow_comfort(present):
     ## snow is not properly considerd at the moment, we leave this function to the fucture.
-    return 10.0 if not present else 1.0
+    return np.where(present, 1.0, 10.0)
 
 def normalize_feels_like_temp(value):
     ## this is the most important factor for the comfort index
-    if 20 <= value <= 26:
-        return 10.0
-    elif 15 <= value < 20:
-        return 7 + (10 - 7) * (20 - value) / 5
-    elif 26 < value <= 30:
-        return 7 + (10 - 7) * (30 - value) / 4
-    elif 10 <= value < 15:
-        return 4 + (7 - 3) * (15 - value) / 5
-    elif 30 < value <= 35:
-        return 4 + (7 - 4) * (35 - value) / 5
-    else:
-        if value < 10:
-            return max(0, 0 + (3 - 0) * (10 - value) / 10)
-        else:
-            return max(0, 0 + (4 - 0) * (value - 35) / 15)
+    value = np.asarray(value, dtype=float)
+    return np.select(
+        [
+            (20 <= value) & (value <= 26),
+            (15 <= value) & (value < 20),
+            (26 < value) & (value <= 30),
+            (10 <= value) & (value < 15),
+            (30 < value) & (value <= 35),
+            value < 10
+        ],
+        [
+            10.0,
+            7 + (10 - 7) * (20 - value) / 5,
+            7 + (10 - 7) * (30 - value) / 4,
+            4 + (7 - 3) * (15 - value) / 5,
+            4 + (7 - 4) * (35 - value) / 5,
+            np.maximum(0, 0 + (3 - 0) * (10 - value) / 10)
+        ],
+        np.maximum(0, 0 + (4 - 0) * (value - 35) / 15)
+    )
 
 def normalize_humidity_comfort(value):
-    if 40 <= value <= 60:
-        return 10.0
-    elif 30 <= value < 40:
-        return 7 + (9 - 7) * (40 - value) / 10
-    elif 60 < value <= 70:
-        return 7 + (9 - 7) * (70 - value) / 10
-    elif 20 <= value < 30:
-        return 4 + (7 - 4) * (30 - value) / 10
-    elif 70 < value <= 80:
-        return 4 + (7 - 4) * (80 - value) / 10
-    else:
-        if value < 20:
-            return max(0, 0 + (4 - 0) * (20 - value) / 20)
-        else:
-            return max(0, 0 + (4 - 0) * (100 - min(value,100)) / 20)
+    value = np.asarray(value, dtype=float)
+    return np.select(
+        [
+            (40 <= value) & (value <= 60),
+            (30 <= value) & (value < 40),
+            (60 < value) & (value <= 70),
+            (20 <= value) & (value < 30),
+            (70 < value) & (value <= 80),
+            value < 20
+        ],
+        [
+            10.0,
+            7 + (9 - 7) * (40 - value) / 10,
+            7 + (9 - 7) * (70 - value) / 10,
+            4 + (7 - 4) * (30 - value) / 10,
+            4 + (7 - 4) * (80 - value) / 10,
+            np.maximum(0, 0 + (4 - 0) * (20 - value) / 20)
+        ],
+        np.maximum(0, 0 + (4 - 0) * (100 - np.minimum(value, 100)) / 20)
+    )
 
 # -------------------------------
 # Final classification
@@ -129,26 +152,49 @@ def classify_comfort_level(score):
 # Main function for one row
 # -------------------------------
 
+def calculate_comfort_scores(columns):
+    """
+    Score many locations at once. columns maps each input of calculate_comfort_score
+    to an array with one value per location (e.g. forecast_arrays.window_averages).
+
+    Returns:
+        Dictionary of score arrays, unrounded: Cloud_Score, UV_Score,
+        Visibility_Score, Rain_Score, Snow_Score, FeelsLikeTemp_Score,
+        Humidity_Score and Comfort_Score
+    """
+    cloud = normalize_cloud_comfort(columns['cloud_coverage'])
+    uv = normalize_uv_comfort(columns['uv_index'])
+    vis = normalize_visibility_comfort(columns['visibility_m'])
+    rain = normalize_rain_comfort(columns['rain_mm'])
+    snow = normalize_snow_comfort(columns['snow_present'])
+    feels = normalize_feels_like_temp(columns['feels_like_temp'])
+    humidity = normalize_humidity_comfort(columns['humidity'])
+
+    return {
+        'Cloud_Score': cloud,
+        'UV_Score': uv,
+        'Visibility_Score': vis,
+        'Rain_Score': rain,
+        'Snow_Score': snow,
+        'FeelsLikeTemp_Score': feels,
+        'Humidity_Score': humidity,
+        'Comfort_Score': (cloud + uv + vis + rain + snow + feels + humidity) / 7
+    }
+
 def calculate_comfort_score(row):
-    cloud = normalize_cloud_comfort(row['cloud_coverage'])
-    uv = normalize_uv_comfort(row['uv_index'])
-    vis = normalize_visibility_comfort(row['visibility_m'])
-    rain = normalize_rain_comfort(row['rain_mm'])
-    snow = normalize_snow_comfort(row['snow_present'])
-    feels = normalize_feels_like_temp(row['feels_like_temp'])
-    humidity = normalize_humidity_comfort(row['humidity'])
+    scores = calculate_comfort_scores(row)
 
-    final_score = round((cloud + uv + vis + rain + snow + feels + humidity) / 7, 2)
+    final_score = round(float(scores['Comfort_Score']), 2)
     level = classify_comfort_level(final_score)
 
     return pd.Series({
-        'Cloud_Score': round(cloud, 2),
-        'UV_Score': round(uv, 2),
-        'Visibility_Score': round(vis, 2),
-        'Rain_Score': round(rain, 2),
-        'Snow_Score': round(snow, 2),
-        'FeelsLikeTemp_Score': round(feels, 2),
-        'Humidity_Score': round(humidity, 2),
+        'Cloud_Score': round(float(scores['Cloud_Score']), 2),
+        'UV_Score': round(float(scores['UV_Score']), 2),
+        'Visibility_Score': round(float(scores['Visibility_Score']), 2),
+        'Rain_Score': round(float(scores['Rain_Score']), 2),
+        'Snow_Score': round(float(scores['Snow_Score']), 2),
+        'FeelsLikeTemp_Score': round(float(scores['FeelsLikeTemp_Score']), 2),
+        'Humidity_Score': round(float(scores['Humidity_Score']), 2),
         'Comfort_Score': final_score,
         'Comfort_Level': level
     })
@@ -165,14 +211,37 @@ def calculate_comfort_score(row):
 #     ]
 
 #     df = pd.DataFrame(data)
-#     results = df.apply(calculate_comfort_score, axis=1)
+#     # Score whole columns at once rather than row by row with df.apply
+#     results = pd.DataFrame(calculate_comfort_scores(df), index=df.index).round(2)
+#     results['Comfort_Level'] = results['Comfort_Score'].map(classify_comfort_level)
 #     df_final = pd.concat([df, results], axis=1)
 
     # print(df_final[['location', 'Comfort_Score', 'Comfort_Level',
     #                 'Cloud_Score', 'UV_Score', 'Visibility_Score',
     #                 'Rain_Score', 'Snow_Score', 'FeelsLikeTemp_Score', 'Humidity_Score']])
 
-def calculate_destination_comfort_score(location_data, target_date, start_hour=9, end_hour=17):
+def comfort_score_summary(scores, location, start_hour, end_hour, hourly_data):
+    """
+    Package one location's scores (row `location` of calculate_comfort_scores
+    arrays) as returned by calculate_destination_comfort_score.
+    """
+    comfort_score = round(scores['Comfort_Score'][location].item(), 2)
+    
+    return {
+        'comfort_score': comfort_score,
+        'comfort_level': classify_comfort_level(comfort_score),
+        'cloud_score': round(scores['Cloud_Score'][location].item(), 2),
+        'uv_score': round(scores['UV_Score'][location].item(), 2),
+        'visibility_score': round(scores['Visibility_Score'][location].item(), 2),
+        'rain_score': round(scores['Rain_Score'][location].item(), 2),
+        'snow_score': round(scores['Snow_Score'][location].item(), 2),
+        'feels_like_temp_score': round(scores['FeelsLikeTemp_Score'][location].item(), 2),
+        'humidity_score': round(scores['Humidity_Score'][location].item(), 2),
+        'time_range': f"{start_hour:02d}:00-{end_hour:02d}:00",
+        'hourly_data': hourly_data
+    }
+
+def calculate_destination_comfort_score(location_data, target_date, start_hour=9, end_hour=17, forecast=None):
     """
     Calculate comfort score for a destination on a specific date and time range.
     
@@ -181,71 +250,58 @@ def calculate_destination_comfort_score(location_data, target_date, start_hour=9
         target_date: Target date as datetime.date object
         start_hour: Start hour for time range (default: 9)
         end_hour: End hour for time range (default: 17)
+        forecast: The location's forecast entry for target_date, if already known (optional)
     
     Returns:
         Dictionary with comfort score and breakdown, or None if no data available
     """
     # Find the forecast for the target date
-    target_date_str = target_date.strftime('%Y-%m-%d')
+    if forecast is None:
+        target_date_str = target_date.strftime('%Y-%m-%d')
+        forecast = next((f for f in location_data['forecast'] if f['date'] == target_date_str), None)
+        if forecast is None:
+            return None
     
-    for forecast in location_data['forecast']:
-        if forecast['date'] == target_date_str:
-            # Filter hourly data for the specified time range
-            filtered_hours = []
-            for hour_data in forecast['hourly']:
-                hour = datetime.strptime(hour_data['time'], '%Y-%m-%d %H:%M').hour
-                if start_hour <= hour <= end_hour:
-                    filtered_hours.append(hour_data)
-            
-            if not filtered_hours:
-                return None
-            
-            # Calculate average values for the time range
-            total_cloud = sum(h['cloud'] for h in filtered_hours)
-            total_uv = sum(h['uv'] for h in filtered_hours)
-            total_visibility = sum(h['vis_km'] * 1000 for h in filtered_hours)  # Convert km to meters
-            total_rain = sum(h['precip_mm'] for h in filtered_hours)
-            total_snow = sum(1 for h in filtered_hours if h.get('will_it_snow', 0) > 0)
-            total_feels_like = sum(h['feelslike_c'] for h in filtered_hours)
-            total_humidity = sum(h['humidity'] for h in filtered_hours)
-            
-            avg_cloud = total_cloud / len(filtered_hours)
-            avg_uv = total_uv / len(filtered_hours)
-            avg_visibility = total_visibility / len(filtered_hours)
-            avg_rain = total_rain / len(filtered_hours)
-            snow_present = total_snow > 0
-            avg_feels_like = total_feels_like / len(filtered_hours)
-            avg_humidity = total_humidity / len(filtered_hours)
-            
-            # Create a row for the comfort score calculation
-            row = {
-                'cloud_coverage': avg_cloud,
-                'uv_index': avg_uv,
-                'visibility_m': avg_visibility,
-                'rain_mm': avg_rain,
-                'snow_present': snow_present,
-                'feels_like_temp': avg_feels_like,
-                'humidity': avg_humidity
-            }
-            
-            # Calculate comfort score
-            scores = calculate_comfort_score(row)
-            
-            return {
-                'comfort_score': scores['Comfort_Score'],
-                'comfort_level': scores['Comfort_Level'],
-                'cloud_score': scores['Cloud_Score'],
-                'uv_score': scores['UV_Score'],
-                'visibility_score': scores['Visibility_Score'],
-                'rain_score': scores['Rain_Score'],
-                'snow_score': scores['Snow_Score'],
-                'feels_like_temp_score': scores['FeelsLikeTemp_Score'],
-                'humidity_score': scores['Humidity_Score'],
-                'time_range': f"{start_hour:02d}:00-{end_hour:02d}:00",
-                'hourly_data': filtered_hours
-            }
+    # Filter hourly data for the specified time range
+    filtered_hours = []
+    for hour_data in forecast['hourly']:
+        # time is 'YYYY-MM-DD HH:MM'
+        hour = int(hour_data['time'][11:13])
+        if start_hour <= hour <= end_hour:
+            filtered_hours.append(hour_data)
+    
+    if not filtered_hours:
+        return None
+    
+    # Calculate average values for the time range
+    total_cloud = sum(h['cloud'] for h in filtered_hours)
+    total_uv = sum(h['uv'] for h in filtered_hours)
+    total_visibility = sum(h['vis_km'] * 1000 for h in filtered_hours)  # Convert km to meters
+    total_rain = sum(h['precip_mm'] for h in filtered_hours)
+    total_snow = sum(1 for h in filtered_hours if h.get('will_it_snow', 0) > 0)
+    total_feels_like = sum(h['feelslike_c'] for h in filtered_hours)
+    total_humidity = sum(h['humidity'] for h in filtered_hours)
+    
+    avg_cloud = total_cloud / len(filtered_hours)
+    avg_uv = total_uv / len(filtered_hours)
+    avg_visibility = total_visibility / len(filtered_hours)
+    avg_rain = total_rain / len(filtered_hours)
+    snow_present = total_snow > 0
+    avg_feels_like = total_feels_like / len(filtered_hours)
+    avg_humidity = total_humidity / len(filtered_hours)
     
-    return None
+    # Create a one-location column set for the comfort score calculation
+    columns = {
+        'cloud_coverage': np.array([avg_cloud]),
+        'uv_index': np.array([avg_uv]),
+        'visibility_m': np.array([avg_visibility]),
+        'rain_mm': np.array([avg_rain]),
+        'snow_present': np.array([snow_present]),
+        'feels_like_temp': np.array([avg_feels_like]),
+        'humidity': np.array([avg_humidity])
+    }
+    
+    return comfort_score_summary(calculate_comfort_scores(columns), 0, start_hour, end_hour, filtered_hours)
 
 def remove_duplicate_cities(destinations):
     """
@@ -265,7 +321,7 @@ def remove_duplicate_cities(destinations):
     # Return the deduplicated list
     return list(city_groups.values())
 
-def get_top_comfortable_destinations(weather_data, target_date, start_hour=9, end_hour=17, max_distance=None, start_coords=None):
+def get_top_comfortable_destinations(weather_data, target_date, start_hour=9, end_hour=17, max_distance=None, start_coords=None, distances=None, forecasts=None, forecast_arrays=None, averages=None):
     """
     Get top 30 destinations with highest comfort scores.
     
@@ -276,28 +332,67 @@ def get_top_comfortable_destinations(weather_data, target_date, start_hour=9, en
         end_hour: End hour for time range
         max_distance: Maximum distance in miles (optional)
         start_coords: Starting coordinates as (lat, lon) tuple (optional)
+        distances: Precomputed distances in miles from start_coords to every
+            location, in weather_data order (optional, computed if missing)
+        forecasts: Forecasts for target_date keyed by location position, as
+            built by forecast_index.build_date_index (optional, built if missing)
+        forecast_arrays: Hourly readings flattened by forecast_arrays.build_forecast_arrays
+            (optional); when given, every location is averaged and scored in one pass
+        averages: forecast_arrays.window_averages for target_date and the time range
+            (optional, computed from forecast_arrays if missing)
     
     Returns:
         List of top 30 destinations sorted by comfort score
     """
-    from geopy.distance import geodesic
+    locations = weather_data.get('weather_data', [])
+    
+    # Work out every distance in one vectorized pass, then only score the
+    # locations that fall within max_distance
+    if max_distance and start_coords:
+        if distances is None:
+            distances = distance_miles_within(
+                start_coords[0], start_coords[1], *location_coordinates(weather_data), max_distance
+            )
+        candidates = np.flatnonzero(distances <= max_distance).tolist()
+    else:
+        distances = np.zeros(len(locations))
+        candidates = range(len(locations))
+    
+    # Only locations with a forecast on the target date can be scored
+    target_date_str = target_date.strftime('%Y-%m-%d')
+    if forecasts is None:
+        forecasts = build_date_index(weather_data).get(target_date_str, {})
+    
+    # With the flattened arrays, every location is averaged and scored in one vectorized pass
+    if averages is None and forecast_arrays is not None:
+        averages = window_averages(forecast_arrays, target_date_str, start_hour, end_hour)
+    if averages is not None:
+        scores = calculate_comfort_scores(averages)
+        # Rank from the score arrays and only build destinations for the top 30
+        scored = [i for i in candidates if i in forecasts and averages['hours'][i]]
+        ranked_scores = [round(score, 2) for score in scores['Comfort_Score'][scored].tolist()]
+        candidates = top_unique_cities(locations, scored, ranked_scores, 30)
     
     destinations = []
     
-    for index, location_data in enumerate(weather_data.get('weather_data', []), 1):
-        location = location_data['location']
-        dest_coords = (location['latitude'], location['longitude'])
+    for i in candidates:
+        forecast = forecasts.get(i)
+        if forecast is None:
+            continue
         
-        # Check distance if specified
-        if max_distance and start_coords:
-            distance = geodesic(start_coords, dest_coords).miles
-            if distance > max_distance:
-                continue
-        else:
-            distance = 0
+        location_data = locations[i]
+        location = location_data['location']
+        index = i + 1
+        distance = float(distances[i])
         
         # Calculate comfort score
-        comfort_data = calculate_destination_comfort_score(location_data, target_date, start_hour, end_hour)
+        if averages is None:
+            comfort_data = calculate_destination_comfort_score(location_data, target_date, start_hour, end_hour, forecast)
+        elif averages['hours'][i]:
+            hourly_data = window_hourly_data(forecast_arrays, forecast, i, target_date_str, start_hour, end_hour)
+            comfort_data = comfort_score_summary(scores, i, start_hour, end_hour, hourly_data)
+        else:
+            comfort_data = None
         
         if comfort_data:
             # Calculate temperature range from hourly data
@@ -0,0 +1,98 @@
+import numpy as np
+
+# Hourly readings the scores use, stored as (location, date, hour) arrays
+HOURLY_FIELDS = ('cloud', 'uv', 'vis_km', 'precip_mm', 'will_it_snow', 'feelslike_c', 'humidity')
+
+
+def build_forecast_arrays(weather_data):
+    """
+    Flatten every hourly forecast into dense arrays, built once at load.
+
+    Returns:
+        Dictionary with:
+            dates: {date string: position on the date axis}
+            hourly: {field: float array of shape (locations, dates, 24)}, NaN where
+                there is no reading (will_it_snow defaults to 0 like the scores do)
+            positions: int array of the same shape holding each reading's position in
+                forecast['hourly'], or -1, so the original hour dicts can be sliced out
+        Row i of every array is location i of weather_data['weather_data'].
+    """
+    locations = weather_data.get('weather_data', [])
+    dates = sorted({forecast['date'] for location_data in locations for forecast in location_data['forecast']})
+    date_positions = {date: j for j, date in enumerate(dates)}
+
+    shape = (len(locations), len(dates), 24)
+    hourly = {field: np.full(shape, np.nan) for field in HOURLY_FIELDS}
+    positions = np.full(shape, -1, dtype=np.int32)
+
+    for i, location_data in enumerate(locations):
+        for forecast in location_data['forecast']:
+            j = date_positions[forecast['date']]
+            for k, hour_data in enumerate(forecast['hourly']):
+                # time is 'YYYY-MM-DD HH:MM'
+                hour = int(hour_data['time'][11:13])
+                positions[i, j, hour] = k
+                for field in HOURLY_FIELDS:
+                    hourly[field][i, j, hour] = hour_data.get(field, 0)
+
+    return {'dates': date_positions, 'hourly': hourly, 'positions': positions}
+
+
+def _window(start_hour, end_hour):
+    """Slice of the hour axis covering start_hour..end_hour inclusive"""
+    return slice(max(start_hour, 0), max(min(end_hour, 23) + 1, 0))
+
+
+def window_averages(forecast_arrays, date, start_hour, end_hour):
+    """
+    Average every hourly field over start_hour..end_hour (inclusive) of date, for all locations at once.
+
+    Hours are summed one at a time in order, as the per-location scoring loops
+    do, so the averages match theirs exactly.
+
+    Returns:
+        Dictionary of arrays with one value per location: hours (readings in the
+        window; 0 means the location can't be scored) and the averaged inputs
+        for calculate_sunny_scores / calculate_comfort_scores.
+        None if there are no forecasts for date.
+    """
+    j = forecast_arrays['dates'].get(date)
+    if j is None:
+        return None
+
+    hours_slice = _window(start_hour, end_hour)
+    window = {field: values[:, j, hours_slice] for field, values in forecast_arrays['hourly'].items()}
+    present = forecast_arrays['positions'][:, j, hours_slice] >= 0
+    n_locations, n_hours = present.shape
+
+    totals = {field: np.zeros(n_locations) for field in window}
+    totals['visibility_m'] = np.zeros(n_locations)
+    snow_hours = np.zeros(n_locations, dtype=np.int64)
+
+    for k in range(n_hours):
+        for field, values in window.items():
+            totals[field] += np.where(present[:, k], values[:, k], 0.0)
+        totals['visibility_m'] += np.where(present[:, k], window['vis_km'][:, k] * 1000, 0.0)  # km to meters
+        snow_hours += present[:, k] & (window['will_it_snow'][:, k] > 0)
+
+    hours = present.sum(axis=1)
+    # Locations without readings get NaN averages; callers skip them via hours == 0
+    count = np.where(hours > 0, hours, np.nan)
+
+    return {
+        'hours': hours,
+        'cloud_coverage': totals['cloud'] / count,
+        'uv_index': totals['uv'] / count,
+        'visibility_m': totals['visibility_m'] / count,
+        'rain_mm': totals['precip_mm'] / count,
+        'snow_present': snow_hours > 0,
+        'feels_like_temp': totals['feelslike_c'] / count,
+        'humidity': totals['humidity'] / count
+    }
+
+
+def window_hourly_data(forecast_arrays, forecast, location, date, start_hour, end_hour):
+    """The forecast's hour dicts for start_hour..end_hour, in order, without parsing any times"""
+    j = forecast_arrays['dates'][date]
+    hourly = forecast['hourly']
+    return [hourly[k] for k in forecast_arrays['positions'][location, j, _window(start_hour, end_hour)] if k >= 0]
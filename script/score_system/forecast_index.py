@@ -0,0 +1,15 @@
+def build_date_index(weather_data):
+    """
+    Index every forecast by its date string.
+
+    Returns:
+        Dictionary of {date: {location position: forecast}}, where location
+        position is the 0-based row in weather_data['weather_data']
+    """
+    date_index = {}
+
+    for i, location_data in enumerate(weather_data.get('weather_data', [])):
+        for forecast in location_data['forecast']:
+            date_index.setdefault(forecast['date'], {})[i] = forecast
+
+    return date_index
@@ -0,0 +1,103 @@
+import numpy as np
+from pyproj import Geod
+
+# Radius of the earth in miles for the spherical distances (haversine and KD-tree
+# chords). The app imports it from here so every caller uses the same value
+EARTH_RADIUS_MILES = 3956
+
+# WGS84 ellipsoid: equatorial radius in miles and first eccentricity squared
+WGS84_RADIUS_MILES = 6378.137 / 1.609344
+WGS84_E2 = (1 / 298.257223563) * (2 - 1 / 298.257223563)
+
+# Metres in a statute mile
+METERS_PER_MILE = 1609.344
+
+# Shortest degree of latitude in miles (at the equator), so bounding boxes err on the large side
+MILES_PER_DEGREE = 68.7
+
+# WGS84 geodesic solver (Karney's algorithm, compiled), shared by every call
+_GEOD = Geod(ellps='WGS84')
+
+
+def location_coordinates(weather_data):
+    """
+    Extract destination coordinates into two parallel NumPy arrays (degrees).
+    The order matches weather_data['weather_data'], so row i of the arrays is location i.
+    """
+    locations = weather_data.get('weather_data', [])
+    lats = np.fromiter((l['location']['latitude'] for l in locations), dtype=np.float64, count=len(locations))
+    lons = np.fromiter((l['location']['longitude'] for l in locations), dtype=np.float64, count=len(locations))
+    return lats, lons
+
+
+def unit_sphere_xyz(lats, lons):
+    """
+    Project coordinates (degrees) onto the unit sphere as an (N, 3) array, so
+    great-circle neighbourhoods become plain Euclidean ones for a KD-tree.
+    """
+    lat_rad, lon_rad = np.radians(lats), np.radians(lons)
+    cos_lat = np.cos(lat_rad)
+    return np.column_stack((cos_lat * np.cos(lon_rad), cos_lat * np.sin(lon_rad), np.sin(lat_rad)))
+
+
+def chord_length(distance_miles, radius_miles=EARTH_RADIUS_MILES):
+    """Straight-line distance on the unit sphere between two points distance_miles apart along the surface"""
+    return 2 * np.sin(np.minimum(distance_miles / radius_miles, np.pi) / 2)
+
+
+def cheap_ruler_miles(lat, lon, lats, lons):
+    """
+    Cheap-ruler distance in miles from one point to many (degrees in).
+
+    A flat-earth approximation scaled by the WGS84 meridian and parallel
+    curvature at each pair's mid latitude: one cos per destination instead of
+    a haversine's trig chain, and closer to the true ellipsoidal distance.
+    """
+    cos_mid = np.cos(np.radians((lats + lat) / 2))
+    w2 = 1 / (1 - WGS84_E2 * (1 - cos_mid * cos_mid))
+    w = np.sqrt(w2)
+
+    # Miles per degree along the parallel (kx) and the meridian (ky)
+    miles_per_degree = np.radians(WGS84_RADIUS_MILES)
+    kx = miles_per_degree * w * cos_mid
+    ky = miles_per_degree * w * w2 * (1 - WGS84_E2)
+
+    dx = ((lons - lon + 180) % 360 - 180) * kx
+    dy = (lats - lat) * ky
+    return np.sqrt(dx * dx + dy * dy)
+
+
+def geodesic_miles(lat, lon, lats, lons):
+    """
+    Exact WGS84 geodesic distance in miles from one point to many (degrees in).
+    Same result as geopy's geodesic, but the whole array goes through pyproj in one call.
+    """
+    _, _, distance_m = _GEOD.inv(np.full_like(lons, lon), np.full_like(lats, lat), lons, lats)
+    return distance_m / METERS_PER_MILE
+
+
+def distance_miles_within(lat, lon, lats, lons, max_distance, approx=True):
+    """
+    Distances in miles, only computed for destinations inside the bounding box
+    of the max_distance circle. A subtraction and comparison is far cheaper
+    than the distance kernel, and most destinations are rejected by the box.
+
+    Uses cheap_ruler_miles, within ~0.1% of the ellipsoidal distance for
+    UK-sized trips, so a destination that close to max_distance may land on
+    the other side of it. Pass approx=False for exact geodesic_miles.
+
+    Returns:
+        NumPy array of distances, with np.inf for destinations outside the box
+    """
+    dlat_max = max_distance / MILES_PER_DEGREE
+    # Degrees of longitude shrink towards the poles, so size the box at its most poleward edge
+    edge_lat = min(abs(lat) + dlat_max, 90.0)
+    dlon_max = max_distance / (MILES_PER_DEGREE * max(np.cos(np.radians(edge_lat)), 0.01))
+
+    in_box = (np.abs(lats - lat) <= dlat_max) & (np.abs((lons - lon + 180) % 360 - 180) <= dlon_max)
+
+    distance_miles = cheap_ruler_miles if approx else geodesic_miles
+
+    distances = np.full(len(lats), np.inf)
+    distances[in_box] = distance_miles(lat, lon, lats[in_box], lons[in_box])
+    return distances
@@ -0,0 +1,31 @@
+import heapq
+from operator import itemgetter
+
+
+def top_unique_cities(locations, positions, scores, limit=30):
+    """
+    Pick the best-scoring locations without building a destination for each one.
+
+    Args:
+        locations: weather_data['weather_data'] list
+        positions: Candidate location positions, in ascending order
+        scores: Each candidate's rounded score, parallel to positions
+        limit: Number of locations to return
+
+    Returns:
+        Up to limit positions, highest score first, keeping one location per city
+        (name + region + country). Ties resolve exactly as remove_duplicate_cities
+        followed by a stable sort: the first best location per city, cities in
+        the order they were first seen.
+    """
+    best = {}
+
+    for position, score in zip(positions, scores):
+        location = locations[position]['location']
+        city_key = f"{location['name']}_{location['region']}_{location['country']}"
+
+        if city_key not in best or score > best[city_key][1]:
+            best[city_key] = (position, score)
+
+    # nlargest is a stable partial sort: only the top `limit` are ordered
+    return [position for position, _ in heapq.nlargest(limit, best.values(), key=itemgetter(1))]
@@ -1,61 +1,73 @@
+import numpy as np
 import pandas as pd
-from datetime import datetime
+
+from forecast_arrays import window_averages, window_hourly_data
+from forecast_index import build_date_index
+from geo_distance import distance_miles_within, location_coordinates
+from ranking import top_unique_cities
 
 
 ## Please check the comfor_index  file first for an explanation of the formular.
 
+# The normalize_* functions take a value or a NumPy array of values (one per
+# location) and return the normalized score(s) as an array. np.select picks the
+# first matching range, like the if/elif ladders they replace
+
 def normalize_cloud_coverage(value):
-    if value <= 10:
-        return 10.0
-    elif value <= 24:
-        return 8 + (10 - 8) * (24 - value) / (24 - 10)
-    elif value <= 49:
-        return 5 + (8 - 5) * (49 - value) / (49 - 25)
-    elif value <= 90:
-        return 2 + (5 - 2) * (90 - value) / (90 - 50)
-    else:
-        return max(0, 0 + (2 - 0) * (100 - value) / (100 - 90))
+    value = np.asarray(value, dtype=float)
+    return np.select(
+        [value <= 10, value <= 24, value <= 49, value <= 90],
+        [
+            10.0,
+            8 + (10 - 8) * (24 - value) / (24 - 10),
+            5 + (8 - 5) * (49 - value) / (49 - 25),
+            2 + (5 - 2) * (90 - value) / (90 - 50)
+        ],
+        np.maximum(0, 0 + (2 - 0) * (100 - value) / (100 - 90))
+    )
 
 def normalize_uv_index(value):
-    if value <= 2:
-        return value * 2  # up to 4
-    elif value <= 5:
-        return 4 + (8 - 4) * (value - 2) / (5 - 2)
-    elif value <= 7:
-        return 8 + (10 - 8) * (value - 5) / (7 - 5)
-    elif value <= 10:
-        return 10.0
-    else:
-        return 10.0
+    value = np.asarray(value, dtype=float)
+    return np.select(
+        [value <= 2, value <= 5, value <= 7],
+        [
+            value * 2,  # up to 4
+            4 + (8 - 4) * (value - 2) / (5 - 2),
+            8 + (10 - 8) * (value - 5) / (7 - 5)
+        ],
+        10.0
+    )
 
 def normalize_visibility(value):
-    if value > 30000:
-        return 10.0
-    elif value > 10000:
-        return 9 + (10 - 9) * (value - 10000) / (30000 - 10000)
-    elif value > 4000:
-        return 3 + (8 - 3) * (value - 4001) / (10000 - 4001)
-    elif value > 1000:
-        return 1 + (2 - 1) * (value - 1001) / (4000 - 1001)
-    else:
-        return 0.0
+    value = np.asarray(value, dtype=float)
+    return np.select(
+        [value > 30000, value > 10000, value > 4000, value > 1000],
+        [
+            10.0,
+            9 + (10 - 9) * (value - 10000) / (30000 - 10000),
+            3 + (8 - 3) * (value - 4001) / (10000 - 4001),
+            1 + (2 - 1) * (value - 1001) / (4000 - 1001)
+        ],
+        0.0
+    )
 
 def normalize_rain(value):
       ## the gap between 8 and 9 represent the unwilliness to have rain
-    if value == 0.0:
-        return 10.0
-    elif value <= 0.9:
-        return 9.0
-    elif value <= 10:
-        return max(5, 8 - (value - 1) * (3/9))  # 8 to 5
-    elif value <= 30:
-        return max(1, 5 - (value - 11) * (4/19))  # 5 to 1
-    else:
-        return 0.0
+    value = np.asarray(value, dtype=float)
+    return np.select(
+        [value == 0.0, value <= 0.9, value <= 10, value <= 30],
+        [
+            10.0,
+            9.0,
+            np.maximum(5, 8 - (value - 1) * (3/9)),  # 8 to 5
+            np.maximum(1, 5 - (value - 11) * (4/19))  # 5 to 1
+        ],
+        0.0
+    )
 
 def normalize_snow(present):
       ## we need to revisit this logic here, in some rare case what if someone would like a bit of snow? This can be like a easter egg function for the broswer mode. 
-    return 10.0 if not present else 0.0
+    return np.where(present, 0.0, 10.0)
 
 def classify_sunny_level(score):
     if score >= 9:
@@ -69,27 +81,66 @@ def classify_sunny_level(score):
     else:
         return 'Overcast'
 
+def calculate_sunny_scores(columns):
+    """
+    Score many locations at once. columns maps each input of calculate_sunny_score
+    to an array with one value per location (e.g. forecast_arrays.window_averages).
+
+    Returns:
+        Dictionary of score arrays, unrounded: Cloud_Score, UV_Score,
+        Visibility_Score, Rain_Score, Snow_Score and Sunny_Score
+    """
+    cloud = normalize_cloud_coverage(columns['cloud_coverage'])
+    uv = normalize_uv_index(columns['uv_index'])
+    vis = normalize_visibility(columns['visibility_m'])
+    rain = normalize_rain(columns['rain_mm'])
+    snow = normalize_snow(columns['snow_present'])
+
+    return {
+        'Cloud_Score': cloud,
+        'UV_Score': uv,
+        'Visibility_Score': vis,
+        'Rain_Score': rain,
+        'Snow_Score': snow,
+        'Sunny_Score': (cloud + uv + vis + rain + snow) / 5
+    }
+
 def calculate_sunny_score(row):
-    cloud = normalize_cloud_coverage(row['cloud_coverage'])
-    uv = normalize_uv_index(row['uv_index'])
-    vis = normalize_visibility(row['visibility_m'])
-    rain = normalize_rain(row['rain_mm'])
-    snow = normalize_snow(row['snow_present'])
+    scores = calculate_sunny_scores(row)
 
-    final_score = round((cloud + uv + vis + rain + snow) / 5, 2)
+    final_score = round(float(scores['Sunny_Score']), 2)
     level = classify_sunny_level(final_score)
 
     return pd.Series({
-        'Cloud_Score': round(cloud, 2),
-        'UV_Score': round(uv, 2),
-        'Visibility_Score': round(vis, 2),
-        'Rain_Score': round(rain, 2),
-        'Snow_Score': round(snow, 2),
+        'Cloud_Score': round(float(scores['Cloud_Score']), 2),
+        'UV_Score': round(float(scores['UV_Score']), 2),
+        'Visibility_Score': round(float(scores['Visibility_Score']), 2),
+        'Rain_Score': round(float(scores['Rain_Score']), 2),
+        'Snow_Score': round(float(scores['Snow_Score']), 2),
         'Sunny_Score': final_score,
         'Sunny_Level': level
     })
 
-def calculate_destination_sunny_score(location_data, target_date, start_hour=9, end_hour=17):
+def sunny_score_summary(scores, location, start_hour, end_hour, hourly_data):
+    """
+    Package one location's scores (row `location` of calculate_sunny_scores
+    arrays) as returned by calculate_destination_sunny_score.
+    """
+    sunny_score = round(scores['Sunny_Score'][location].item(), 2)
+    
+    return {
+        'sunny_score': sunny_score,
+        'sunny_level': classify_sunny_level(sunny_score),
+        'cloud_score': round(scores['Cloud_Score'][location].item(), 2),
+        'uv_score': round(scores['UV_Score'][location].item(), 2),
+        'visibility_score': round(scores['Visibility_Score'][location].item(), 2),
+        'rain_score': round(scores['Rain_Score'][location].item(), 2),
+        'snow_score': round(scores['Snow_Score'][location].item(), 2),
+        'time_range': f"{start_hour:02d}:00-{end_hour:02d}:00",
+        'hourly_data': hourly_data
+    }
+
+def calculate_destination_sunny_score(location_data, target_date, start_hour=9, end_hour=17, forecast=None):
     """
     Calculate sunny score for a destination on a specific date and time range.
     
@@ -98,63 +149,52 @@ def calculate_destination_sunny_score(location_data, target_date, start_hour=9,
         target_date: Target date as datetime.date object
         start_hour: Start hour for time range (default: 9)
         end_hour: End hour for time range (default: 17)
+        forecast: The location's forecast entry for target_date, if already known (optional)
     
     Returns:
         Dictionary with sunny score and breakdown, or None if no data available
     """
     # Find the forecast for the target date
-    target_date_str = target_date.strftime('%Y-%m-%d')
+    if forecast is None:
+        target_date_str = target_date.strftime('%Y-%m-%d')
+        forecast = next((f for f in location_data['forecast'] if f['date'] == target_date_str), None)
+        if forecast is None:
+            return None
     
-    for forecast in location_data['forecast']:
-        if forecast['date'] == target_date_str:
-            # Filter hourly data for the specified time range
-            filtered_hours = []
-            for hour_data in forecast['hourly']:
-                hour = datetime.strptime(hour_data['time'], '%Y-%m-%d %H:%M').hour
-                if start_hour <= hour <= end_hour:
-                    filtered_hours.append(hour_data)
-            
-            if not filtered_hours:
-                return None
-            
-            # Calculate average values for the time range
-            total_cloud = sum(h['cloud'] for h in filtered_hours)
-            total_uv = sum(h['uv'] for h in filtered_hours)
-            total_visibility = sum(h['vis_km'] * 1000 for h in filtered_hours)  # Convert km to meters
-            total_rain = sum(h['precip_mm'] for h in filtered_hours)
-            total_snow = sum(1 for h in filtered_hours if h.get('will_it_snow', 0) > 0)
-            
-            avg_cloud = total_cloud / len(filtered_hours)
-            avg_uv = total_uv / len(filtered_hours)
-            avg_visibility = total_visibility / len(filtered_hours)
-            avg_rain = total_rain / len(filtered_hours)
-            snow_present = total_snow > 0
-            
-            # Create a row for the sunny score calculation
-            row = {
-                'cloud_coverage': avg_cloud,
-                'uv_index': avg_uv,
-                'visibility_m': avg_visibility,
-                'rain_mm': avg_rain,
-                'snow_present': snow_present
-            }
-            
-            # Calculate sunny score
-            scores = calculate_sunny_score(row)
-            
-            return {
-                'sunny_score': scores['Sunny_Score'],
-                'sunny_level': scores['Sunny_Level'],
-                'cloud_score': scores['Cloud_Score'],
-                'uv_score': scores['UV_Score'],
-                'visibility_score': scores['Visibility_Score'],
-                'rain_score': scores['Rain_Score'],
-                'snow_score': scores['Snow_Score'],
-                'time_range': f"{start_hour:02d}:00-{end_hour:02d}:00",
-                'hourly_data': filtered_hours
-            }
+    # Filter hourly data for the specified time range
+    filtered_hours = []
+    for hour_data in forecast['hourly']:
+        # time is 'YYYY-MM-DD HH:MM'
+        hour = int(hour_data['time'][11:13])
+        if start_hour <= hour <= end_hour:
+            filtered_hours.append(hour_data)
+    
+    if not filtered_hours:
+        return None
+    
+    # Calculate average values for the time range
+    total_cloud = sum(h['cloud'] for h in filtered_hours)
+    total_uv = sum(h['uv'] for h in filtered_hours)
+    total_visibility = sum(h['vis_km'] * 1000 for h in filtered_hours)  # Convert km to meters
+    total_rain = sum(h['precip_mm'] for h in filtered_hours)
+    total_snow = sum(1 for h in filtered_hours if h.get('will_it_snow', 0) > 0)
+    
+    avg_cloud = total_cloud / len(filtered_hours)
+    avg_uv = total_uv / len(filtered_hours)
+    avg_visibility = total_visibility / len(filtered_hours)
+    avg_rain = total_rain / len(filtered_hours)
+    snow_present = total_snow > 0
+    
+    # Create a one-location column set for the sunny score calculation
+    columns = {
+        'cloud_coverage': np.array([avg_cloud]),
+        'uv_index': np.array([avg_uv]),
+        'visibility_m': np.array([avg_visibility]),
+        'rain_mm': np.array([avg_rain]),
+        'snow_present': np.array([snow_present])
+    }
     
-    return None
+    return sunny_score_summary(calculate_sunny_scores(columns), 0, start_hour, end_hour, filtered_hours)
 
 def remove_duplicate_cities(destinations):
     """
@@ -174,7 +214,7 @@ def remove_duplicate_cities(destinations):
     # Return the deduplicated list
     return list(city_groups.values())
 
-def get_top_sunny_destinations(weather_data, target_date, start_hour=9, end_hour=17, max_distance=None, start_coords=None):
+def get_top_sunny_destinations(weather_data, target_date, start_hour=9, end_hour=17, max_distance=None, start_coords=None, distances=None, forecasts=None, forecast_arrays=None, averages=None):
     """
     Get top 30 destinations with highest sunny scores.
     
@@ -185,28 +225,67 @@ def get_top_sunny_destinations(weather_data, target_date, start_hour=9, end_hour
         end_hour: End hour for time range
         max_distance: Maximum distance in miles (optional)
         start_coords: Starting coordinates as (lat, lon) tuple (optional)
+        distances: Precomputed distances in miles from start_coords to every
+            location, in weather_data order (optional, computed if missing)
+        forecasts: Forecasts for target_date keyed by location position, as
+            built by forecast_index.build_date_index (optional, built if missing)
+        forecast_arrays: Hourly readings flattened by forecast_arrays.build_forecast_arrays
+            (optional); when given, every location is averaged and scored in one pass
+        averages: forecast_arrays.window_averages for target_date and the time range
+            (optional, computed from forecast_arrays if missing)
     
     Returns:
         List of top 30 destinations sorted by sunny score
     """
-    from geopy.distance import geodesic
+    locations = weather_data.get('weather_data', [])
+    
+    # Work out every distance in one vectorized pass, then only score the
+    # locations that fall within max_distance
+    if max_distance and start_coords:
+        if distances is None:
+            distances = distance_miles_within(
+                start_coords[0], start_coords[1], *location_coordinates(weather_data), max_distance
+            )
+        candidates = np.flatnonzero(distances <= max_distance).tolist()
+    else:
+        distances = np.zeros(len(locations))
+        candidates = range(len(locations))
+    
+    # Only locations with a forecast on the target date can be scored
+    target_date_str = target_date.strftime('%Y-%m-%d')
+    if forecasts is None:
+        forecasts = build_date_index(weather_data).get(target_date_str, {})
+    
+    # With the flattened arrays, every location is averaged and scored in one vectorized pass
+    if averages is None and forecast_arrays is not None:
+        averages = window_averages(forecast_arrays, target_date_str, start_hour, end_hour)
+    if averages is not None:
+        scores = calculate_sunny_scores(averages)
+        # Rank from the score arrays and only build destinations for the top 30
+        scored = [i for i in candidates if i in forecasts and averages['hours'][i]]
+        ranked_scores = [round(score, 2) for score in scores['Sunny_Score'][scored].tolist()]
+        candidates = top_unique_cities(locations, scored, ranked_scores, 30)
     
     destinations = []
     
-    for index, location_data in enumerate(weather_data.get('weather_data', []), 1):
-        location = location_data['location']
-        dest_coords = (location['latitude'], location['longitude'])
+    for i in candidates:
+        forecast = forecasts.get(i)
+        if forecast is None:
+            continue
         
-        # Check distance if specified
-        if max_distance and start_coords:
-            distance = geodesic(start_coords, dest_coords).miles
-            if distance > max_distance:
-                continue
-        else:
-            distance = 0
+        location_data = locations[i]
+        location = location_data['location']
+        index = i + 1
+        distance = float(distances[i])
         
         # Calculate sunny score
-        sunny_data = calculate_destination_sunny_score(location_data, target_date, start_hour, end_hour)
+        if averages is None:
+            sunny_data = calculate_destination_sunny_score(location_data, target_date, start_hour, end_hour, forecast)
+        elif averages['hours'][i]:
+            hourly_data = window_hourly_data(forecast_arrays, forecast, i, target_date_str, start_hour, end_hour)
+            sunny_data = sunny_score_summary(scores, i, start_hour, end_hour, hourly_data)
+        else:
+            sunny_data = None
         
         if sunny_data:
             # Calculate temperature range from hourly data
@@ -253,7 +332,9 @@ def get_top_sunny_destinations(weather_data, target_date, start_hour=9, end_hour
 # ]
 
 # df = pd.DataFrame(data)
-# results = df.apply(calculate_sunny_score, axis=1)
+# # Score whole columns at once rather than row by row with df.apply
+# results = pd.DataFrame(calculate_sunny_scores(df), index=df.index).round(2)
+# results['Sunny_Level'] = results['Sunny_Score'].map(classify_sunny_level)
 # df_final = pd.concat([df, results], axis=1)
 
 # print(df_final[['location', 'Sunny_Score', 'Sunny_Level', 'Cloud_Score', 'UV_Score', 'Visibility_Score', 'Rain_Score', 'Snow_Score']])
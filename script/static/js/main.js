@@ -381,7 +381,7 @@ function setupLocationAutocomplete() {
     const suggestionsDiv = document.getElementById('locationSuggestions');
     
     const debouncedSearch = Utils.debounce(async (query) => {
-        if (query.length < 2) {
+        if (query.trim().length < 3) {
             suggestionsDiv.innerHTML = '';
             suggestionsDiv.style.display = 'none';
             return;
@@ -18,20 +18,27 @@ The script will:
 """
 
 import json
+import mmap
 import os
 from datetime import datetime, date, timedelta
 import sys
 from typing import Dict, Any, List
 
+import orjson
+
 def load_weather_data(file_path: str) -> Dict[str, Any]:
     """Load weather data from JSON file."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        # Parse straight from a memory map with orjson, as the app does
+        with open(file_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                memoryview(mm) as view:
+            return orjson.loads(view)
     except FileNotFoundError:
         print(f"Error: {file_path} not found")
         sys.exit(1)
-    except json.JSONDecodeError as e:
+    except ValueError as e:
+        # orjson.JSONDecodeError is a ValueError, as is mmap's error for an empty file
         print(f"Error: Invalid JSON in {file_path}: {e}")
         sys.exit(1)
 
@@ -14,6 +14,8 @@ class WeatherDataProcessor:
     def __init__(self, api_key: str):
         self.api_key = api_key
         self.base_url = "http://api.weatherapi.com/v1/forecast.json"
+        # One keep-alive session for every location instead of a new connection per request
+        self.session = requests.Session()
     
     def get_weather_data(self, lat: float, lon: float) -> Dict[str, Any]:
         """Fetch weather data from WeatherAPI.com."""
@@ -26,7 +28,7 @@ class WeatherDataProcessor:
         }
         
         try:
-            response = requests.get(self.base_url, params=params, timeout=REQUEST_TIMEOUT)
+            response = self.session.get(self.base_url, params=params, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
@@ -0,0 +1,19 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# app.py lives in script/ and adds score_system/ to the path itself
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'script'))
+
+import app as weather_app
+
+INVERNESS = SimpleNamespace(address='Inverness, Highland, Scotland, United Kingdom', latitude=57.4778, longitude=-4.2247)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Test client whose geocoder answers every query with Inverness, without calling Nominatim"""
+    monkeypatch.setattr(weather_app, 'geocode_location', lambda query: INVERNESS)
+    return weather_app.app.test_client()
@@ -0,0 +1,20 @@
+def test_batch_reports_bad_items_without_failing_the_others(client):
+    response = client.post('/batch', json=[
+        {'path': '/cells-in-radius', 'query': {'lat': 51.5, 'lon': -0.1, 'radius': 5}},
+        # No JSON body: Flask answers 415 with an HTML page
+        {'path': '/search', 'method': 'POST'},
+        {'path': '/location-suggest', 'query': 5},
+        {'path': '/location-suggest', 'method': 3},
+        {'path': '/weather-data'},
+        {'path': '/location-suggest', 'query': {'q': 'lo'}}
+    ])
+
+    assert response.status_code == 200
+    results = response.get_json()
+    assert [result['status'] for result in results] == [200, 415, 400, 400, 404, 200]
+
+    assert results[0]['body']['total_cells'] == 1
+    assert isinstance(results[1]['body'], str) and 'Unsupported Media Type' in results[1]['body']
+    assert 'error' in results[2]['body'] and 'error' in results[3]['body']
+    assert results[4]['body'] == {'error': '/weather-data cannot be batched'}
+    assert results[5]['body'] == []
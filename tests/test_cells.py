@@ -0,0 +1,15 @@
+import pytest
+
+import app as weather_app
+
+
+@pytest.mark.parametrize('radius, expected', [
+    ('-200', 0),
+    ('-inf', 0),
+    ('nan', 0),
+    ('inf', len(weather_app.GRID_INDEX['cells'])),
+])
+def test_radius_edge_cases_follow_distance_within_radius(client, radius, expected):
+    query = f'/cells-in-radius?lat=51.5&lon=-0.1&radius={radius}'
+    assert client.get(query).get_json()['total_cells'] == expected
+    assert client.get(query.replace('/cells-in-radius', '/project-weather-index')).get_json()['total_cells'] == expected
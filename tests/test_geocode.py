@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+import pytest
+
+import app as weather_app
+
+LEEDS = SimpleNamespace(address='Leeds, West Yorkshire, England, United Kingdom', latitude=53.7974, longitude=-1.5438)
+
+
+@pytest.fixture
+def geocode_db(tmp_path, monkeypatch):
+    """A fresh on-disk geocode cache for the test, with empty in-memory caches"""
+    monkeypatch.setattr(weather_app, 'GEOCODE_DB_PATH', str(tmp_path / 'geocode_cache.sqlite3'))
+    monkeypatch.setattr(weather_app, '_geocode_db', None)
+    weather_app._geocode_cached.cache_clear()
+    weather_app._suggest_cached.cache_clear()
+    yield
+    weather_app._geocode_cached.cache_clear()
+    weather_app._suggest_cached.cache_clear()
+
+
+def test_empty_geocoder_answers_are_not_stored(geocode_db, monkeypatch):
+    answers = iter([None, LEEDS])
+    monkeypatch.setattr(weather_app, 'nominatim_geocode', lambda query, **kwargs: next(answers))
+
+    assert weather_app._geocode_cached('leeds', 0) is None
+    # A later process (or day) asks Nominatim again rather than reusing the miss
+    weather_app._geocode_cached.cache_clear()
+    assert weather_app._geocode_cached('leeds', 0).latitude == LEEDS.latitude
+
+    # Found locations are served from disk without another lookup
+    weather_app._geocode_cached.cache_clear()
+    assert weather_app._geocode_cached('leeds', 0).address == LEEDS.address
+
+
+def test_nominatim_slots_are_spaced_through_the_shared_file(geocode_db):
+    first = weather_app._claim_nominatim_slot()
+
+    # Another worker process opens its own connection to the same file
+    weather_app._geocode_db = None
+    second = weather_app._claim_nominatim_slot()
+
+    assert second - first >= weather_app.NOMINATIM_MIN_INTERVAL
@@ -0,0 +1,63 @@
+import pytest
+
+import app as weather_app
+
+CACHED_FUNCTIONS = ('_search_cached', '_projection_cached', '_window_scores_cached', '_sunny_cached', '_comfort_cached')
+
+
+@pytest.fixture(autouse=True)
+def restore_loaded_data(monkeypatch):
+    """Put back the startup data and empty the caches after a test reloads"""
+    for name in ('WEATHER_DATA', 'WEATHER_DATA_PAYLOAD', 'LOCATION_INDEX', '_location_indexes'):
+        monkeypatch.setattr(weather_app, name, getattr(weather_app, name))
+    monkeypatch.setattr(weather_app, 'schedule_next_reload', lambda: None)
+    yield
+    monkeypatch.undo()
+    for name in CACHED_FUNCTIONS:
+        getattr(weather_app, name).cache_clear()
+
+
+def test_reload_keys_cached_results_on_the_new_generation(client, monkeypatch):
+    old_index = weather_app.LOCATION_INDEX
+    query = '/project-weather-index?lat=51.5&lon=-0.1&radius=20&date=2025-08-22'
+    before = client.get(query).get_json()
+
+    weather_app.auto_refresh()
+
+    new_index = weather_app.LOCATION_INDEX
+    assert new_index is not old_index
+    assert new_index['generation'] == old_index['generation'] + 1
+    # Requests that started on the old data still resolve its snapshot
+    assert weather_app.location_index_for(old_index['generation']) is old_index
+
+    # A projection finishing on the old data after the swap is filed under the old generation
+    weather_app._projection_cached(old_index['generation'], 51.5, -0.1, 20.0, 'sunny', '2025-08-22', 9, 17)
+    assert client.get(query).get_json() == before
+    hits = weather_app._projection_cached.cache_info().hits
+    weather_app._projection_cached(new_index['generation'], 51.5, -0.1, 20.0, 'sunny', '2025-08-22', 9, 17)
+    assert weather_app._projection_cached.cache_info().hits == hits + 1
+
+
+def test_window_inputs_score_from_the_snapshot_they_were_given():
+    old_index = weather_app.LOCATION_INDEX
+    weather_app.auto_refresh()
+
+    window_scores, _ = weather_app._window_inputs(old_index, 0, '2025-08-22', 9, 17)
+
+    assert window_scores is weather_app._window_scores_cached(old_index['generation'], '2025-08-22', 9, 17)
+    assert window_scores is not weather_app._window_scores_cached(
+        weather_app.LOCATION_INDEX['generation'], '2025-08-22', 9, 17
+    )
+
+
+def test_failed_reload_keeps_the_previous_data(monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(weather_app, 'schedule_next_reload', lambda: scheduled.append(True))
+    monkeypatch.setattr(weather_app, 'load_weather_data', lambda: {"weather_data": []})
+    old_index, old_payload = weather_app.LOCATION_INDEX, weather_app.WEATHER_DATA_PAYLOAD
+
+    weather_app.auto_refresh()
+
+    assert weather_app.LOCATION_INDEX is old_index
+    assert weather_app.WEATHER_DATA_PAYLOAD is old_payload
+    assert scheduled == [True]
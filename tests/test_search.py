@@ -0,0 +1,60 @@
+import pytest
+from geopy.exc import GeocoderServiceError, GeocoderUnavailable
+
+import app as weather_app
+
+# Whitby is 249.94 miles from Inverness along the ellipsoid; the cheap ruler puts it at 250.02
+SEARCH = {'from': 'Inverness', 'date': '2025-08-22', 'start_hour': 9, 'end_hour': 17, 'distance': 250}
+
+
+def destination_cities(results, key):
+    return [destination['city'] for destination in results[key]]
+
+
+def test_exact_distance_keeps_destinations_just_inside_the_limit(client, monkeypatch):
+    monkeypatch.setitem(weather_app.app.config, 'APPROX_DISTANCE', False)
+
+    response = client.post('/search', json=SEARCH)
+
+    assert response.status_code == 200
+    results = response.get_json()
+    for key in ('sunny_destinations', 'comfortable_destinations'):
+        assert 'Whitby' in destination_cities(results, key)
+        assert all(destination['distance'] <= SEARCH['distance'] for destination in results[key])
+
+
+def test_approximate_distance_only_drops_destinations_at_the_limit(client, monkeypatch):
+    monkeypatch.setitem(weather_app.app.config, 'APPROX_DISTANCE', False)
+    exact = client.post('/search', json=SEARCH).get_json()
+    monkeypatch.setitem(weather_app.app.config, 'APPROX_DISTANCE', True)
+    approx = client.post('/search', json=SEARCH).get_json()
+
+    for key in ('sunny_destinations', 'comfortable_destinations'):
+        assert all(destination['distance'] <= SEARCH['distance'] for destination in approx[key])
+        kept = set(destination_cities(approx, key))
+        for destination in exact[key]:
+            if destination['city'] not in kept:
+                # Reported distances are rounded to 0.1 mile
+                assert destination['distance'] >= SEARCH['distance'] * 0.999 - 0.05
+
+
+@pytest.mark.parametrize('error', [GeocoderUnavailable('down'), GeocoderServiceError('refused')])
+def test_geocoder_failures_are_reported_as_unavailable(client, monkeypatch, error):
+    def fail(*args):
+        raise error
+    monkeypatch.setattr(weather_app, 'search_destinations', fail)
+
+    response = client.post('/search', json=SEARCH)
+
+    assert response.status_code == 503
+
+
+def test_unexpected_errors_do_not_leak_details(client, monkeypatch):
+    def fail(*args):
+        raise RuntimeError('/srv/weather/secret.json is corrupt')
+    monkeypatch.setattr(weather_app, 'search_destinations', fail)
+
+    response = client.post('/search', json=SEARCH)
+
+    assert response.status_code == 500
+    assert response.get_json() == {'error': 'internal'}